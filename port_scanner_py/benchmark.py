@@ -0,0 +1,215 @@
+import argparse
+import contextlib
+import ipaddress
+import multiprocessing
+import os
+import random
+import resource
+import selectors
+import socket
+import sys
+import threading
+import time
+
+from port_scanner.engines import DEFAULT_RETRIES, ENGINES
+from port_scanner.result import CLOSED, FILTERED, OPEN, ScanResult
+from port_scanner.scanner import scan_ports
+from port_scanner.timing import DEFAULT_TIMING, TIMING_PROFILES
+
+FARM_NETWORK = "127.0.1.0/24"
+FIRST_PORT = 20000
+# Connections that fill a listen(0) backlog, after which the kernel drops SYNs
+BACKLOG_FILL = 4
+
+
+class ListenerFarm:
+    """Listeners on loopback addresses with known open, closed and filtered ports.
+
+    Open ports accept and immediately close connections. Filtered ports are
+    listening sockets that never accept and whose backlog has been filled,
+    so further SYNs are silently dropped like behind a firewall. Every other
+    port is closed and answers with a RST.
+    """
+
+    def __init__(
+        self,
+        hosts: int,
+        ports: int,
+        open_ratio: float,
+        filtered: int,
+        seed: int = 0,
+    ):
+        rng = random.Random(seed)
+        network = ipaddress.ip_network(FARM_NETWORK)
+        self.hosts = [str(network[i + 1]) for i in range(hosts)]
+        self.ports = range(FIRST_PORT, FIRST_PORT + ports)
+        self.truth: dict[tuple[str, int], str] = {}
+        for host in self.hosts:
+            shuffled = rng.sample(self.ports, len(self.ports))
+            num_open = round(len(shuffled) * open_ratio)
+            for i, port in enumerate(shuffled):
+                if i < num_open:
+                    state = OPEN
+                elif i < num_open + filtered:
+                    state = FILTERED
+                else:
+                    state = CLOSED
+                self.truth[(host, port)] = state
+
+        self._selector = selectors.DefaultSelector()
+        self._sockets: list[socket.socket] = []
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+
+    def start(self):
+        for (host, port), state in self.truth.items():
+            if state == CLOSED:
+                continue
+            sock = socket.socket()
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((host, port))
+            self._sockets.append(sock)
+            if state == OPEN:
+                sock.listen(socket.SOMAXCONN)
+                sock.setblocking(False)
+                self._selector.register(sock, selectors.EVENT_READ)
+            else:
+                sock.listen(0)
+                self._fill_backlog(host, port)
+        self._thread.start()
+
+    def _fill_backlog(self, host: str, port: int):
+        for _ in range(BACKLOG_FILL):
+            client = socket.socket()
+            client.setblocking(False)
+            client.connect_ex((host, port))
+            self._sockets.append(client)
+        time.sleep(0.01)
+
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            for key, _ in self._selector.select(0.1):
+                try:
+                    conn, _ = key.fileobj.accept()  # type: ignore[union-attr]
+                    conn.close()
+                except BlockingIOError:
+                    pass
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self._selector.close()
+        for sock in self._sockets:
+            sock.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _run_engine(hosts: list[str], ports: range, options: dict, conn):
+    # Runs in a fresh process so ru_maxrss is this engine's own peak
+    observed: dict[tuple[str, int], str] = {}
+
+    def on_result(result: ScanResult):
+        observed[(result.host, result.port)] = result.state
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        scan_ports(hosts, ports, discovery=False, on_result=on_result, **options)
+    wall = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    conn.send((wall, peak_rss, observed))
+    conn.close()
+
+
+def run_benchmark(farm: ListenerFarm, engine: str, **options) -> dict:
+    # The farm's accept thread is running, so don't fork
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_run_engine,
+        args=(farm.hosts, farm.ports, dict(options, engine=engine), child),
+    )
+    process.start()
+    child.close()
+    wall, peak_rss, observed = parent.recv()
+    process.join()
+
+    wrong = [key for key, state in farm.truth.items() if observed.get(key) != state]
+    probes = len(farm.truth)
+    return {
+        "engine": engine,
+        "probes": probes,
+        "wall": wall,
+        "rate": probes / wall,
+        "peak_rss": peak_rss,
+        "accuracy": 1 - len(wrong) / probes,
+        "wrong": wrong,
+    }
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scan engines against local listeners"
+    )
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--hosts", help="Loopback hosts", type=int, default=4)
+    parser.add_argument("--ports", help="Ports per host", type=int, default=2000)
+    parser.add_argument(
+        "--open-ratio", help="Share of open ports", type=float, default=0.05
+    )
+    parser.add_argument(
+        "--filtered", help="Filtered ports per host", type=int, default=5
+    )
+    parser.add_argument("--timeout", type=float, default=0.5)
+    parser.add_argument("--timing", choices=TIMING_PROFILES, default=DEFAULT_TIMING)
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    if args.hosts > 254:
+        sys.exit(f"At most 254 hosts fit in {FARM_NETWORK}")
+
+    farm = ListenerFarm(
+        args.hosts, args.ports, args.open_ratio, args.filtered, args.seed
+    )
+    print(
+        f"{len(farm.hosts)} hosts x {len(farm.ports)} ports "
+        f"({args.open_ratio:.0%} open, {args.filtered} filtered per host)"
+    )
+    print(
+        f"{'engine':<8} {'wall (s)':>9} {'probes/s':>10} "
+        f"{'peak RSS (MiB)':>15} {'accuracy':>9}"
+    )
+    with farm:
+        for engine in args.engines:
+            report = run_benchmark(
+                farm,
+                engine,
+                timeout=args.timeout,
+                timing=args.timing,
+                concurrency=args.concurrency,
+                retries=args.retries,
+                workers=args.workers,
+            )
+            print(
+                f"{engine:<8} {report['wall']:>9.2f} {report['rate']:>10.0f} "
+                f"{report['peak_rss'] / (1 << 20):>15.1f} "
+                f"{report['accuracy']:>9.2%}"
+            )
+            for host, port in report["wrong"][:5]:
+                expected = farm.truth[(host, port)]
+                print(f"  mismatch {host}:{port}, expected {expected}")
+
+
+if __name__ == "__main__":
+    main()
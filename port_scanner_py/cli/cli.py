@@ -1,8 +1,24 @@
 from .port_parser import parse_ports
-from .host_parser import parse_hosts
+from .host_parser import load_exclude_file, parse_exclusions, parse_hosts
+from port_scanner.banner import BANNER_TIMEOUT
+from port_scanner.output import FORMATS
+from port_scanner.progress import PROGRESS_FORMATS, PROGRESS_INTERVAL
+from port_scanner.engines import DEFAULT_RETRIES, ENGINES
+from port_scanner.resolver import DEFAULT_RESOLVER_CONCURRENCY, Resolver
+from port_scanner.scheduler import DEFAULT_HOST_CONCURRENCY
+from port_scanner.timing import DEFAULT_TIMING, TIMING_PROFILES
 import argparse
 
 TOP_1000_PORTS_FILE = "./data/ports.txt"
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(value: str) -> float:
+    unit = DURATION_UNITS.get(value[-1:].lower())
+    try:
+        return float(value[:-1]) * unit if unit else float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid duration: {value}")
 
 
 def get_args():
@@ -11,7 +27,127 @@ def get_args():
         "--host", nargs="+", help="List of IP or ranges", type=str, required=True
     )
     parser.add_argument(
-        "--timeout", help="Timeout for each port scan", type=int, default=1
+        "--exclude",
+        nargs="+",
+        help="IPs, ranges, CIDRs or hostnames that must never be probed",
+        default=[],
+    )
+    parser.add_argument(
+        "--exclude-file",
+        help="File with one exclusion per line, '#' starts a comment",
+    )
+    parser.add_argument(
+        "--timeout",
+        help="Fixed upper bound for each connect, overrides the timing profile",
+        type=float,
+    )
+    parser.add_argument(
+        "--timing",
+        help="Timing profile used to adapt connect timeouts to measured RTTs",
+        choices=TIMING_PROFILES,
+        default=DEFAULT_TIMING,
+    )
+    parser.add_argument(
+        "--engine", help="Scan engine to use", choices=ENGINES, default="thread"
+    )
+    parser.add_argument(
+        "--concurrency",
+        help="Maximum number of in-flight connection attempts",
+        type=int,
+    )
+    parser.add_argument(
+        "--retries",
+        help="Extra attempts for ports that give no answer before they are "
+        "reported as filtered",
+        type=int,
+        default=DEFAULT_RETRIES,
+    )
+    parser.add_argument(
+        "--workers",
+        help="Number of scanner processes to shard the work across",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--host-concurrency",
+        help="Maximum number of in-flight connection attempts per host",
+        type=int,
+        default=DEFAULT_HOST_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--dns-concurrency",
+        help="Maximum number of hostname lookups running at once",
+        type=int,
+        default=DEFAULT_RESOLVER_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--no-discovery",
+        help="Scan every target without checking which hosts are up first",
+        dest="discovery",
+        action="store_false",
+    )
+    parser.add_argument(
+        "--max-rate", help="Maximum number of probes sent per second", type=float
+    )
+    parser.add_argument(
+        "--adaptive-rate",
+        help="Back off from --max-rate when probes start timing out",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--banners",
+        help="Read a banner from open ports for up to TIMEOUT seconds "
+        f"(default {BANNER_TIMEOUT}) and identify the service",
+        nargs="?",
+        type=float,
+        const=BANNER_TIMEOUT,
+        metavar="TIMEOUT",
+    )
+    parser.add_argument(
+        "--format", help="Output format for results", choices=FORMATS, default="text"
+    )
+    parser.add_argument(
+        "-o", "--output", help="Write results to this file instead of stdout"
+    )
+    parser.add_argument(
+        "--all-states",
+        help="Report every probed port, not only open ones",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--progress",
+        help="Report progress on stderr as a status line or as JSON lines",
+        choices=PROGRESS_FORMATS,
+    )
+    parser.add_argument(
+        "--progress-interval",
+        help="Seconds between progress reports",
+        type=float,
+        default=PROGRESS_INTERVAL,
+    )
+    parser.add_argument(
+        "--db",
+        help="SQLite database keeping the state of every port seen open; "
+        "previously open ports are probed first",
+    )
+    parser.add_argument(
+        "--diff",
+        help="Only report ports that are newly open or no longer open",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--since",
+        help="Skip the full sweep if the last one finished less than this "
+        "long ago (e.g. 30m, 24h, 7d), only rescanning previously open ports",
+        type=parse_duration,
+    )
+    parser.add_argument(
+        "--checkpoint", help="Periodically save scan progress to this file"
+    )
+    parser.add_argument(
+        "--resume",
+        help="Skip work already finished according to --checkpoint",
+        action="store_true",
     )
 
     port_group = parser.add_mutually_exclusive_group(required=False)
@@ -23,7 +159,21 @@ def get_args():
     )
 
     args = parser.parse_args()
-    args.host = parse_hosts(args.host)
+    if args.adaptive_rate and not args.max_rate:
+        parser.error("--adaptive-rate requires --max-rate")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume requires --checkpoint")
+    if (args.diff or args.since) and not args.db:
+        parser.error("--diff and --since require --db")
+    args.targets = list(args.host)
+    resolver = Resolver(args.dns_concurrency)
+    try:
+        if args.exclude_file:
+            args.exclude += load_exclude_file(args.exclude_file)
+        exclusions = parse_exclusions(args.exclude, resolver)
+        args.host = parse_hosts(args.host, resolver, exclusions)
+    except (argparse.ArgumentTypeError, OSError) as e:
+        parser.error(str(e))
     if args.port:
         args.port = parse_ports(ports=args.port)
     else:
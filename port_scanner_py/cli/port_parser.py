@@ -1,7 +1,57 @@
 import argparse
+import bisect
+import functools
+from typing import Iterable, Iterator
 
 
-def parse_port(value: str) -> list[int]:
+class PortSet:
+    """Sorted, deduplicated set of ports stored as merged ranges.
+
+    Overlapping and adjacent ranges are merged on construction, so
+    `-p 1-65535 80 443` is a single range and every port is probed once.
+    """
+
+    def __init__(self, ranges: Iterable[range] = ()):
+        merged: list[list[int]] = []
+        for r in sorted((r for r in ranges if r), key=lambda r: r.start):
+            if merged and r.start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], r.stop - 1)
+            else:
+                merged.append([r.start, r.stop - 1])
+        self._starts = [start for start, _ in merged]
+        self._ends = [end for _, end in merged]
+        self._len = sum(end - start + 1 for start, end in merged)
+
+    def ranges(self) -> list[range]:
+        return [range(s, e + 1) for s, e in zip(self._starts, self._ends)]
+
+    def __contains__(self, port: object) -> bool:
+        if not isinstance(port, int):
+            return False
+        i = bisect.bisect_right(self._starts, port) - 1
+        return i >= 0 and port <= self._ends[i]
+
+    def __iter__(self) -> Iterator[int]:
+        for s, e in zip(self._starts, self._ends):
+            yield from range(s, e + 1)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PortSet):
+            return NotImplemented
+        return self._starts == other._starts and self._ends == other._ends
+
+    def __repr__(self) -> str:
+        parts = [
+            f"{r.start}-{r.stop - 1}" if len(r) > 1 else str(r.start)
+            for r in self.ranges()
+        ]
+        return f"PortSet({','.join(parts)})"
+
+
+def parse_port(value: str) -> range:
     if "-" in value:
         parts = value.split("-")
         if len(parts) != 2:
@@ -13,7 +63,7 @@ def parse_port(value: str) -> list[int]:
             raise argparse.ArgumentTypeError(f"Invalid Port format: {value}")
         if end < start or end > 65535 or start < 0:
             raise argparse.ArgumentTypeError(f"Invalid Port range: {value}")
-        return list(range(start, end + 1))
+        return range(start, end + 1)
     else:
         # Single port
         try:
@@ -22,28 +72,31 @@ def parse_port(value: str) -> list[int]:
             raise argparse.ArgumentTypeError(f"Invalid Port format: {value}")
 
         if 0 <= port <= 65535:
-            return [port]
+            return range(port, port + 1)
         raise argparse.ArgumentTypeError(f"Invalid Port: {value}")
 
 
-def parse_ports(ports: list[str] = [], ports_file: str = ""):
+@functools.lru_cache(maxsize=None)
+def load_ports_file(ports_file: str) -> PortSet:
+    try:
+        with open(ports_file, "r") as f:
+            ranges = []
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                for p in line.split(","):
+                    ranges.append(parse_port(p))
+            return PortSet(ranges)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Ports file not found: {ports_file}")
+
+
+def parse_ports(ports: list[str] = [], ports_file: str = "") -> PortSet:
     if ports:
-        result = []
-        for p in ports:
-            result.extend(parse_port(p))
-        return result
+        return PortSet(parse_port(p) for p in ports)
 
     if ports_file:
-        try:
-            with open(ports_file, "r") as f:
-                result = []
-                for line in f:
-                    line = line.strip()
-                    ports = line.split(",")
-                    for p in ports:
-                        result.extend(parse_port(p))
-                return result
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Ports file not found: {ports_file}")
+        return load_ports_file(ports_file)
 
     raise ValueError("Either port or ports_file must be provided")
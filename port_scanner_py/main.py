@@ -1,7 +1,130 @@
+import hashlib
+import json
+import logging
+import signal
+import sys
+import time
+
 from cli.cli import get_args
+from port_scanner.checkpoint import Checkpoint
+from port_scanner.output import OutputStage, open_writer
+from port_scanner.result import ScanResult
 from port_scanner.scanner import scan_ports
+from port_scanner.scheduler import DEFAULT_CHUNK_SIZE
+from port_scanner.store import ResultStore
+
+
+def main():
+    # Exit through the normal cleanup path on SIGTERM so the checkpoint is saved
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(128 + signal.SIGTERM))
+    logging.basicConfig(format="%(message)s", level=logging.INFO)
+
+    args = get_args()
+    hosts, ports, timeout = args.host, args.port, args.timeout
+    # Exclusion lists can be long, so scans are told apart by a digest
+    exclude = hashlib.sha256("\n".join(args.exclude).encode()).hexdigest()
+
+    checkpoint = None
+    if args.checkpoint:
+        meta = {
+            "targets": args.targets,
+            "exclude": exclude,
+            "ports": repr(ports),
+            "discovery": args.discovery,
+            "chunk_size": DEFAULT_CHUNK_SIZE,
+        }
+        if args.resume:
+            try:
+                checkpoint = Checkpoint.load(args.checkpoint, meta)
+            except ValueError as e:
+                sys.exit(str(e))
+        else:
+            checkpoint = Checkpoint(args.checkpoint, meta)
+
+    store = ResultStore(args.db) if args.db else None
+    options = dict(
+        timeout=timeout,
+        engine=args.engine,
+        concurrency=args.concurrency,
+        host_concurrency=args.host_concurrency,
+        timing=args.timing,
+        max_rate=args.max_rate,
+        adaptive_rate=args.adaptive_rate,
+        workers=args.workers,
+        banner_timeout=args.banners,
+        retries=args.retries,
+    )
+
+    # A diff also reports ports that are no longer open
+    states = None if args.all_states or args.diff else ("open",)
+    with OutputStage(open_writer(args.format, args.output), states) as output:
+
+        def report(result: ScanResult):
+            if store:
+                store.record(result)
+                if args.diff and not store.changed(result):
+                    return
+            output.submit(result)
+
+        try:
+            probed: set[tuple[str, int]] = set()
+            if store:
+                # Ports that were open before are the likeliest to change
+                known = store.known_ports(hosts, ports)
+                # Only the ports each host had open, not every pairing
+                pairs = {
+                    (host, port)
+                    for host, host_ports in known.items()
+                    for port in host_ports
+                }
+                if pairs:
+
+                    def report_known(result: ScanResult):
+                        probed.add((result.host, result.port))
+                        report(result)
+
+                    scan_ports(
+                        list(known),
+                        sorted({port for _, port in pairs}),
+                        discovery=False,
+                        on_result=report_known,
+                        quiet=True,
+                        only_probes=pairs,
+                        **options,
+                    )
+
+            sweep = json.dumps(
+                {"targets": args.targets, "exclude": exclude, "ports": repr(ports)}
+            )
+            last_sweep = store.last_sweep(sweep) if store else None
+            if args.since and last_sweep and time.time() - last_sweep < args.since:
+                print(
+                    "[+] Last full sweep is recent, only rescanned previously "
+                    f"open ports on {len(known)} host(s)",
+                    file=sys.stderr,
+                )
+                return
+
+            scan_ports(
+                hosts,
+                ports,
+                discovery=args.discovery,
+                on_result=report,
+                checkpoint=checkpoint,
+                skip_probes=probed,
+                progress=args.progress,
+                progress_interval=args.progress_interval,
+                **options,
+            )
+            if store:
+                store.record_sweep(sweep)
+        except KeyboardInterrupt:
+            print("Scan interrupted", file=sys.stderr)
+            sys.exit(130)
+        finally:
+            if store:
+                store.close()
 
-args = get_args()
-hosts, ports, timeout = args.host, args.port, args.timeout
 
-scan_ports(hosts, ports, timeout)
+if __name__ == "__main__":
+    main()
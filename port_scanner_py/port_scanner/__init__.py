@@ -0,0 +1,2 @@
+from .result import CLOSED, FILTERED, OPEN, ScanResult  # noqa: F401
+from .scanner import Scanner, scan_ports  # noqa: F401
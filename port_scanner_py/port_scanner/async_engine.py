@@ -0,0 +1,134 @@
+import asyncio
+import time
+from typing import Callable
+
+from .banner import BANNER_BYTES, with_banner
+from .limits import RESOURCE_ERRORS, ResourceBackoff, lower_concurrency
+from .rate_limiter import RateLimiter
+from .result import CLOSED, FILTERED, OPEN, TIMEOUT_ERRORS, ScanResult
+from .scheduler import ProbeScheduler
+from .timing import HostTimeouts
+
+
+async def scan_port_async(
+    host: str, port: int, timeout: float = 1, banner_timeout: float | None = None
+) -> ScanResult:
+    return (await _scan_port_async(host, port, timeout, banner_timeout))[0]
+
+
+async def _scan_port_async(
+    host: str, port: int, timeout: float, banner_timeout: float | None
+) -> tuple[ScanResult, bool]:
+    """scan_port_async, also telling whether the connect timed out."""
+    start = time.monotonic()
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout=timeout
+        )
+    except ConnectionRefusedError:
+        return ScanResult(host, port, CLOSED, time.monotonic() - start), False
+    except asyncio.TimeoutError:
+        return ScanResult(host, port, FILTERED), True
+    except OSError as e:
+        if e.errno in RESOURCE_ERRORS:
+            raise
+        return ScanResult(host, port, FILTERED), e.errno in TIMEOUT_ERRORS
+    rtt = time.monotonic() - start
+
+    banner = b""
+    if banner_timeout:
+        try:
+            banner = await asyncio.wait_for(
+                reader.read(BANNER_BYTES), timeout=banner_timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            pass
+
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return with_banner(ScanResult(host, port, OPEN, rtt), banner), False
+
+
+async def run_async(
+    scheduler: ProbeScheduler,
+    timeouts: HostTimeouts,
+    on_result: Callable[[ScanResult], None],
+    concurrency: int = 1000,
+    timeout: float | None = None,
+    limiter: RateLimiter | None = None,
+    banner_timeout: float | None = None,
+    retries: int = 0,
+):
+    wakeup = asyncio.Event()
+    tasks: set[asyncio.Task] = set()
+    backoff = ResourceBackoff()
+    # Errors from probes or on_result, the first one ends the scan
+    failures: list[Exception] = []
+    # Probes holding a socket; queued and backed off tasks don't
+    connecting = 0
+
+    async def connect(host: str, port: int) -> tuple[ScanResult, bool]:
+        nonlocal concurrency, connecting
+        while True:
+            connecting += 1
+            try:
+                result = await _scan_port_async(
+                    host, port, timeout or timeouts.timeout(host), banner_timeout
+                )
+            except OSError as e:
+                if e.errno not in RESOURCE_ERRORS:
+                    raise
+                # Out of fds or local ports, wait for other probes to finish
+                concurrency = lower_concurrency(concurrency, connecting)
+            else:
+                backoff.succeeded()
+                return result
+            finally:
+                connecting -= 1
+            await asyncio.sleep(backoff.failed())
+
+    async def probe(host: str, port: int):
+        try:
+            for attempt in range(retries + 1):
+                if attempt and limiter and (delay := limiter.reserve()):
+                    await asyncio.sleep(delay)
+                result, timed_out = await connect(host, port)
+                if limiter:
+                    limiter.record(timed_out)
+                # Only a missing answer is worth asking again
+                if not timed_out:
+                    break
+            if result.latency is not None:
+                timeouts.observe(host, result.latency)
+            on_result(result)
+        except Exception as e:
+            failures.append(e)
+        finally:
+            scheduler.release(host, port)
+            wakeup.set()
+
+    while not failures:
+        item = scheduler.next_probe() if scheduler.in_flight < concurrency else None
+        if item is None:
+            if scheduler.finished:
+                break
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), scheduler.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        if limiter and (delay := limiter.reserve()):
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(probe(*item))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if failures:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise failures[0]
@@ -0,0 +1,48 @@
+import re
+
+from .result import ScanResult
+
+BANNER_TIMEOUT = 1.0
+BANNER_BYTES = 1024
+
+# Matched against the first bytes a service sends after the handshake
+SIGNATURES = (
+    ("ssh", rb"SSH-\d+\.\d+-"),
+    ("ftp", rb"220[- ](?:[^\r\n]*FTP|[^\r\n]*FileZilla|[^\r\n]*vsFTPd)"),
+    ("smtp", rb"220[- ][^\r\n]*(?:SMTP|Postfix|Exim|Sendmail)"),
+    ("pop3", rb"\+OK"),
+    ("imap", rb"\* (?:OK|PREAUTH)"),
+    ("http", rb"HTTP/\d\.\d \d{3}"),
+    ("mysql", rb".\x00\x00\x00\x0a[\d.]+"),
+    ("redis", rb"-(?:ERR|NOAUTH|DENIED)"),
+    ("vnc", rb"RFB \d{3}\.\d{3}"),
+    ("telnet", rb"\xff[\xfb-\xfe]"),
+    ("ftp", rb"220[- ]"),
+)
+
+# One alternation of named groups, so a banner is matched in a single pass
+# and `lastgroup` tells which signature hit. Earlier entries win.
+_SIGNATURES = re.compile(
+    b"|".join(
+        b"(?P<s%d>%s)" % (i, pattern) for i, (_, pattern) in enumerate(SIGNATURES)
+    ),
+    re.DOTALL,
+)
+
+
+def identify(banner: bytes) -> str | None:
+    """Return the service whose signature matches the banner, if any."""
+    match = _SIGNATURES.match(banner)
+    if match is None or match.lastgroup is None:
+        return None
+    return SIGNATURES[int(match.lastgroup[1:])][0]
+
+
+def decode_banner(banner: bytes) -> str:
+    return banner.decode("utf-8", "backslashreplace").strip()
+
+
+def with_banner(result: ScanResult, banner: bytes) -> ScanResult:
+    if not banner:
+        return result
+    return result._replace(service=identify(banner), banner=decode_banner(banner))
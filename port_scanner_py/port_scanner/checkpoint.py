@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+import time
+
+from .intervals import IntervalSet
+from .result import OPEN, ScanResult
+
+CHECKPOINT_VERSION = 1
+DEFAULT_INTERVAL = 30.0
+
+
+class Checkpoint:
+    """Finished work units and open ports of a scan, saved to disk periodically.
+
+    Finished units are kept as merged [start, end] intervals of unit ids,
+    which stays small because hosts and chunks complete roughly in order.
+    `meta` describes the scan (targets, ports, chunk size); a checkpoint is
+    only resumed by a scan with identical meta.
+    """
+
+    def __init__(self, path: str, meta: dict, interval: float = DEFAULT_INTERVAL):
+        self.path = path
+        self.meta = meta
+        self.interval = interval
+        # Hosts found by discovery, reused on resume so unit ids stay stable
+        self.hosts: list[str] | None = None
+        self.results: dict[tuple[str, int], ScanResult] = {}
+        self.done = IntervalSet()
+        self._last_save = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, meta: dict, interval: float = DEFAULT_INTERVAL):
+        checkpoint = cls(path, meta, interval)
+        if not os.path.exists(path):
+            return checkpoint
+
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != CHECKPOINT_VERSION or data.get("meta") != meta:
+            raise ValueError(f"Checkpoint {path} was created for a different scan")
+
+        checkpoint.hosts = data["hosts"]
+        checkpoint.done = IntervalSet(data["done"])
+        for host, port, *rest in data["results"]:
+            checkpoint.results[(host, port)] = ScanResult(host, port, OPEN, *rest)
+        return checkpoint
+
+    def is_done(self, unit: int) -> bool:
+        return unit in self.done
+
+    def mark_done(self, unit: int):
+        with self._lock:
+            self.done.add(unit)
+        if time.monotonic() - self._last_save >= self.interval:
+            self.save()
+
+    def add_result(self, result: ScanResult):
+        if result.state == OPEN:
+            with self._lock:
+                self.results[(result.host, result.port)] = result
+
+    def save(self):
+        with self._lock:
+            data = {
+                "version": CHECKPOINT_VERSION,
+                "meta": self.meta,
+                "hosts": self.hosts,
+                "done": [[s, e] for s, e in self.done],
+                "results": [
+                    [r.host, r.port, r.latency, r.service, r.banner]
+                    for r in self.results.values()
+                ],
+            }
+            self._last_save = time.monotonic()
+
+        # Write to a temporary file first so a crash never leaves it truncated
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,69 @@
+import asyncio
+import ipaddress
+import threading
+from typing import Iterable
+
+from .async_engine import run_async
+from .rate_limiter import RateLimiter
+from .result import ScanResult
+from .scheduler import ProbeScheduler
+from .timing import HostTimeouts
+
+DISCOVERY_PORTS = (80, 443, 22, 445, 3389)
+DISCOVERY_CONCURRENCY = 2000
+# Probes in flight per host, the others are only sent if those get no answer
+DISCOVERY_HOST_CONCURRENCY = 2
+
+
+class _Answered:
+    """Probes of hosts that already answered, discovery skips them."""
+
+    def __init__(self, alive: set[str]):
+        self.alive = alive
+
+    def __contains__(self, probe: object) -> bool:
+        return isinstance(probe, tuple) and probe[0] in self.alive
+
+
+def _address_key(host: str):
+    ip = ipaddress.ip_address(host)
+    return ip.version, int(ip)
+
+
+def discover_hosts(
+    hosts: Iterable[str],
+    timeouts: HostTimeouts,
+    ports: Iterable[int] = DISCOVERY_PORTS,
+    concurrency: int = DISCOVERY_CONCURRENCY,
+    limiter: RateLimiter | None = None,
+    stop: threading.Event | None = None,
+) -> list[str]:
+    """Return the hosts that answer a TCP connect on any of the given ports.
+
+    A refused connection counts as alive too, since only a live host sends
+    the RST, and a host's remaining ports are skipped once one answers.
+    Hosts that have not answered yet are given the profile's short
+    discovery_timeout; the RTTs measured here warm `timeouts` up for the
+    full sweep. Setting `stop` ends discovery early with the hosts found so
+    far.
+    """
+    ports = tuple(ports)
+    alive: set[str] = set()
+
+    def on_result(result: ScanResult):
+        if result.latency is not None:
+            alive.add(result.host)
+
+    host_concurrency = min(DISCOVERY_HOST_CONCURRENCY, len(ports))
+    max_active_hosts = max(1, 2 * concurrency // host_concurrency)
+    scheduler = ProbeScheduler(
+        hosts,
+        ports,
+        host_concurrency,
+        max_active_hosts,
+        stop=stop,
+        skip_probes=_Answered(alive),
+    )
+    capped = timeouts.capped(timeouts.profile.discovery_timeout)
+    asyncio.run(run_async(scheduler, capped, on_result, concurrency, limiter=limiter))
+    return sorted(alive, key=_address_key)
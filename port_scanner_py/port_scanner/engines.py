@@ -0,0 +1,75 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Callable
+
+from .async_engine import run_async
+from .rate_limiter import RateLimiter
+from .result import ScanResult
+from .scheduler import DEFAULT_HOST_CONCURRENCY, ProbeScheduler
+from .select_engine import run_select
+from .thread_engine import run_threads
+from .timing import DEFAULT_TIMING, TIMING_PROFILES, HostTimeouts, TimingProfile
+
+ENGINES = ("thread", "async", "select")
+DEFAULT_CONCURRENCY = {"thread": 8, "async": 1000, "select": 1000}
+# Extra attempts for probes that got no answer
+DEFAULT_RETRIES = 1
+
+
+@dataclass(frozen=True)
+class EngineOptions:
+    """How to run an engine, enough for a worker process to set one up."""
+
+    engine: str = "thread"
+    concurrency: int = DEFAULT_CONCURRENCY["thread"]
+    host_concurrency: int = DEFAULT_HOST_CONCURRENCY
+    max_active_hosts: int = 16
+    profile: TimingProfile = TIMING_PROFILES[DEFAULT_TIMING]
+    max_rate: float | None = None
+    adaptive_rate: bool = False
+    banner_timeout: float | None = None
+    retries: int = DEFAULT_RETRIES
+
+
+def run_engine(
+    scheduler: ProbeScheduler,
+    timeouts: HostTimeouts,
+    on_result: Callable[[ScanResult], None],
+    options: EngineOptions,
+    limiter: RateLimiter | None = None,
+):
+    engine, concurrency = options.engine, options.concurrency
+    if engine == "async":
+        asyncio.run(
+            run_async(
+                scheduler,
+                timeouts,
+                on_result,
+                concurrency,
+                limiter=limiter,
+                banner_timeout=options.banner_timeout,
+                retries=options.retries,
+            )
+        )
+    elif engine == "select":
+        run_select(
+            scheduler,
+            timeouts,
+            on_result,
+            concurrency,
+            limiter,
+            options.banner_timeout,
+            options.retries,
+        )
+    elif engine == "thread":
+        run_threads(
+            scheduler,
+            timeouts,
+            on_result,
+            concurrency,
+            limiter,
+            options.banner_timeout,
+            options.retries,
+        )
+    else:
+        raise ValueError(f"Unknown engine: {engine}")
@@ -0,0 +1,74 @@
+import bisect
+from typing import Iterable, Iterator
+
+
+class IntervalSet:
+    """Set of integers stored as sorted, merged [start, end] intervals.
+
+    Lookups are a bisect over the interval starts, so membership stays
+    O(log n) however many values the set covers.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[int, int]] = ()):
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        for start, end in sorted(intervals):
+            if start > end:
+                continue
+            if self._ends and start <= self._ends[-1] + 1:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, int):
+            return False
+        i = bisect.bisect_right(self._starts, value) - 1
+        return i >= 0 and value <= self._ends[i]
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return zip(self._starts, self._ends)
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    @property
+    def size(self) -> int:
+        return sum(e - s + 1 for s, e in zip(self._starts, self._ends))
+
+    def within(self, low: int, high: int) -> Iterator[tuple[int, int]]:
+        """Yield the intervals overlapping [low, high], clipped to it."""
+        i = max(bisect.bisect_right(self._starts, low) - 1, 0)
+        while i < len(self._starts) and self._starts[i] <= high:
+            if self._ends[i] >= low:
+                yield max(self._starts[i], low), min(self._ends[i], high)
+            i += 1
+
+    def count_within(self, low: int, high: int) -> int:
+        """Return how many values of the set lie in [low, high]."""
+        return sum(e - s + 1 for s, e in self.within(low, high))
+
+    def add(self, value: int):
+        i = bisect.bisect_right(self._starts, value) - 1
+        if i >= 0 and value <= self._ends[i]:
+            return
+        joins_left = i >= 0 and self._ends[i] == value - 1
+        joins_right = i + 1 < len(self._starts) and self._starts[i + 1] == value + 1
+        if joins_left and joins_right:
+            self._ends[i] = self._ends.pop(i + 1)
+            del self._starts[i + 1]
+        elif joins_left:
+            self._ends[i] = value
+        elif joins_right:
+            self._starts[i + 1] = value
+        else:
+            self._starts.insert(i + 1, value)
+            self._ends.insert(i + 1, value)
+
+    def next_missing(self, value: int) -> int:
+        """Return the smallest integer >= value that is not in the set."""
+        i = bisect.bisect_right(self._starts, value) - 1
+        if i >= 0 and value <= self._ends[i]:
+            return self._ends[i] + 1
+        return value
@@ -0,0 +1,94 @@
+import errno
+import logging
+
+try:
+    import resource
+except ImportError:
+    # Windows has no RLIMIT_NOFILE
+    resource = None
+
+# Descriptors kept free for stdio, output files, the resolver and the selector
+FD_RESERVE = 64
+# Soft limit asked for when the hard limit is unlimited
+FD_TARGET = 1 << 20
+# Descriptors assumed to be available where there is no RLIMIT_NOFILE
+FD_FALLBACK = 512
+PORT_RANGE_PATH = "/proc/sys/net/ipv4/ip_local_port_range"
+
+logger = logging.getLogger(__name__)
+
+# The local machine ran out of something, the target did not answer anything
+RESOURCE_ERRORS = frozenset(
+    (errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.ENOMEM, errno.EADDRNOTAVAIL)
+)
+
+
+def fd_limit() -> int | None:
+    """Current RLIMIT_NOFILE soft limit, None where there is none."""
+    if resource is None:
+        return None
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+def raise_fd_limit() -> int:
+    """Raise the RLIMIT_NOFILE soft limit towards the hard limit, return it."""
+    if resource is None:
+        return FD_FALLBACK
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = FD_TARGET if hard == resource.RLIM_INFINITY else hard
+    if soft != resource.RLIM_INFINITY and soft < target:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return FD_TARGET if soft == resource.RLIM_INFINITY else soft
+
+
+def local_port_count() -> int | None:
+    try:
+        with open(PORT_RANGE_PATH) as f:
+            low, high = map(int, f.read().split())
+    except (OSError, ValueError):
+        return None
+    return high - low + 1
+
+
+def max_concurrency(workers: int = 1) -> int:
+    """Most probes one process can keep in flight without running out of fds
+    or, shared between all workers, local ports."""
+    limit = raise_fd_limit() - FD_RESERVE
+    ports = local_port_count()
+    if ports:
+        limit = min(limit, ports // workers)
+    return max(limit, 1)
+
+
+class ResourceBackoff:
+    """Exponential delay before retrying a probe that hit a local limit."""
+
+    MIN_DELAY = 0.01
+    MAX_DELAY = 1.0
+
+    def __init__(self):
+        self.delay = 0.0
+
+    def failed(self) -> float:
+        self.delay = min(max(self.delay * 2, self.MIN_DELAY), self.MAX_DELAY)
+        return self.delay
+
+    def succeeded(self):
+        self.delay = 0.0
+
+
+def lower_concurrency(concurrency: int, in_flight: int) -> int:
+    """Concurrency to continue with after a probe hit a local limit while
+    `in_flight` probes, itself included, were running."""
+    lowered = max(in_flight - 1, 1)
+    if lowered >= concurrency:
+        return concurrency
+    logger.warning(
+        "[!] Out of file descriptors or local ports, concurrency lowered to %d",
+        lowered,
+    )
+    return lowered
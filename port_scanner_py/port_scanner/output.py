@@ -0,0 +1,117 @@
+import csv
+import json
+import queue
+import sys
+import threading
+from typing import Collection, TextIO
+
+from .result import OPEN, ScanResult
+
+FORMATS = ("text", "jsonl", "csv")
+BUFFER_SIZE = 1 << 16
+
+
+class ResultWriter:
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def write(self, result: ScanResult):
+        raise NotImplementedError
+
+    def close(self):
+        self.stream.flush()
+        if self.stream not in (sys.stdout, sys.stderr):
+            self.stream.close()
+
+
+class TextWriter(ResultWriter):
+    def write(self, result: ScanResult):
+        if result.state == OPEN:
+            line = f"[+] {result.host}:{result.port} is open"
+            if result.service:
+                line += f" ({result.service})"
+            if result.banner:
+                line += f" {result.banner!r}"
+            print("\033[92m", line, file=self.stream)
+        else:
+            print(
+                f"[-] {result.host}:{result.port} is {result.state}",
+                file=self.stream,
+            )
+
+
+class JsonLinesWriter(ResultWriter):
+    def write(self, result: ScanResult):
+        record = result._asdict()
+        if result.latency is not None:
+            record["latency"] = round(result.latency, 6)
+        self.stream.write(json.dumps(record) + "\n")
+
+
+class CsvWriter(ResultWriter):
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self._writer = csv.writer(stream)
+        self._writer.writerow(ScanResult._fields)
+
+    def write(self, result: ScanResult):
+        latency = "" if result.latency is None else f"{result.latency:.6f}"
+        self._writer.writerow(
+            (
+                result.host,
+                result.port,
+                result.state,
+                latency,
+                result.service or "",
+                result.banner or "",
+            )
+        )
+
+
+WRITERS = {"text": TextWriter, "jsonl": JsonLinesWriter, "csv": CsvWriter}
+
+
+def open_writer(fmt: str = "text", path: str | None = None) -> ResultWriter:
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    if path and path != "-":
+        stream = open(path, "w", buffering=BUFFER_SIZE, newline="")
+    else:
+        stream = sys.stdout
+    return WRITERS[fmt](stream)
+
+
+class OutputStage:
+    """Single writer thread that serializes results coming from the engines.
+
+    Engines only enqueue results, so worker threads never block on I/O and
+    lines from concurrent probes can't interleave.
+    """
+
+    _DONE = object()
+
+    def __init__(self, writer: ResultWriter, states: Collection[str] | None = (OPEN,)):
+        self.writer = writer
+        self.states = states
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, result: ScanResult):
+        if self.states is None or result.state in self.states:
+            self._queue.put(result)
+
+    def _run(self):
+        while (result := self._queue.get()) is not self._DONE:
+            self.writer.write(result)
+
+    def close(self):
+        self._queue.put(self._DONE)
+        self._thread.join()
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,142 @@
+import json
+import os
+import sys
+import threading
+import time
+from typing import Callable, TextIO
+
+from .limits import fd_limit
+from .result import FILTERED, ScanResult
+
+PROGRESS_FORMATS = ("line", "json")
+PROGRESS_INTERVAL = 1.0
+
+
+def _open_fds() -> int | None:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def _format_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02}:{seconds:02}"
+    return f"{minutes:02}:{seconds:02}"
+
+
+class ProgressReporter:
+    """Periodically reports scan throughput and resource use.
+
+    Alongside probes/sec and the ETA it shows in-flight probes, open file
+    descriptors against RLIMIT_NOFILE, the share of probes that timed out
+    and the CPU used by this process. High CPU points at the scanner
+    itself, fds near the limit at the concurrency, and a rising timeout
+    ratio at the network.
+    """
+
+    def __init__(
+        self,
+        total: int | None = None,
+        fmt: str = "line",
+        interval: float = PROGRESS_INTERVAL,
+        stream: TextIO = sys.stderr,
+        in_flight: Callable[[], int] | None = None,
+    ):
+        if fmt not in PROGRESS_FORMATS:
+            raise ValueError(f"Unknown progress format: {fmt}")
+        self.total = total or None
+        self.fmt = fmt
+        self.interval = interval
+        self.stream = stream
+        self.in_flight = in_flight
+        self.fd_limit = fd_limit()
+        self.completed = 0
+        self._timeouts = 0
+        self._last = (time.monotonic(), time.process_time(), 0, 0)
+        self._start = self._last[0]
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def record(self, result: ScanResult):
+        with self._lock:
+            self.completed += 1
+            self._timeouts += result.state == FILTERED
+
+    def snapshot(self) -> dict:
+        now, cpu = time.monotonic(), time.process_time()
+        with self._lock:
+            completed, timeouts = self.completed, self._timeouts
+        last_time, last_cpu, last_completed, last_timeouts = self._last
+        self._last = (now, cpu, completed, timeouts)
+
+        elapsed = max(now - last_time, 1e-9)
+        probes = completed - last_completed
+        eta = None
+        if self.total and completed:
+            remaining = max(self.total - completed, 0)
+            eta = round(remaining * (now - self._start) / completed, 1)
+        timeout_ratio = (timeouts - last_timeouts) / probes if probes else 0.0
+        return {
+            "time": round(time.time(), 3),
+            "completed": completed,
+            "total": self.total,
+            "rate": round(probes / elapsed, 1),
+            "in_flight": self.in_flight() if self.in_flight else None,
+            "fds": _open_fds(),
+            "fd_limit": self.fd_limit,
+            "timeout_ratio": round(timeout_ratio, 4),
+            "cpu": round((cpu - last_cpu) / elapsed, 3),
+            "eta": eta,
+        }
+
+    def render(self, stats: dict) -> str:
+        if self.fmt == "json":
+            return json.dumps(stats) + "\n"
+        done = f"{stats['completed']}"
+        if stats["total"]:
+            done += f"/{stats['total']} ({stats['completed'] / stats['total']:.1%})"
+        parts = [done, f"{stats['rate']:.0f} probes/s"]
+        if stats["in_flight"] is not None:
+            parts.append(f"in-flight {stats['in_flight']}")
+        if stats["fds"] is not None:
+            limit = stats["fd_limit"]
+            parts.append(f"fds {stats['fds']}" + (f"/{limit}" if limit else ""))
+        parts += [
+            f"timeouts {stats['timeout_ratio']:.1%}",
+            f"cpu {stats['cpu']:.0%}",
+            f"ETA {_format_eta(stats['eta'])}",
+        ]
+        # Overwrite the previous status line in place
+        return "\r\033[K" + "  ".join(parts)
+
+    def report(self):
+        self.stream.write(self.render(self.snapshot()))
+        self.stream.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.report()
+
+    def start(self):
+        self._thread.start()
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join()
+        self.report()
+        if self.fmt == "line":
+            self.stream.write("\n")
+            self.stream.flush()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,70 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket limiting how many probes are sent per second.
+
+    In adaptive mode the rate is cut in half whenever the share of timed out
+    probes jumps above its running baseline, which usually means a firewall
+    is dropping probes or a link is saturated, and then climbs back towards
+    `max_rate` in small steps while the timeout ratio stays normal.
+    """
+
+    WINDOW = 100
+    SPIKE = 0.2
+    DECREASE = 0.5
+    INCREASE = 0.05
+    BASELINE_ALPHA = 0.1
+
+    def __init__(self, max_rate: float, adaptive: bool = False, min_rate: float = 1):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.adaptive = adaptive
+        self.rate = max_rate
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._results = 0
+        self._timeouts = 0
+        self._baseline: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def _burst(self) -> float:
+        return max(1.0, self.rate / 10)
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait before sending the probe."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def record(self, timed_out: bool):
+        if not self.adaptive:
+            return
+        with self._lock:
+            self._results += 1
+            self._timeouts += timed_out
+            if self._results < self.WINDOW:
+                return
+
+            ratio = self._timeouts / self._results
+            self._results = self._timeouts = 0
+            if self._baseline is None:
+                self._baseline = ratio
+            elif ratio > self._baseline + self.SPIKE:
+                self.rate = max(self.min_rate, self.rate * self.DECREASE)
+            else:
+                self.rate = min(
+                    self.max_rate, self.rate + self.max_rate * self.INCREASE
+                )
+            # A network that is simply filtered keeps a high ratio, so the
+            # baseline follows it and the rate is allowed to recover
+            self._baseline += self.BASELINE_ALPHA * (ratio - self._baseline)
@@ -0,0 +1,99 @@
+import ipaddress
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator
+
+DEFAULT_RESOLVER_CONCURRENCY = 32
+DEFAULT_DNS_TTL = 300.0
+
+
+def _address_key(address: str):
+    ip = ipaddress.ip_address(address)
+    return ip.version, int(ip)
+
+
+class Resolver:
+    """Resolves hostnames on a bounded thread pool, caching the answers.
+
+    getaddrinfo does not expose record TTLs, so every answer, failures
+    included, is kept for a fixed `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_RESOLVER_CONCURRENCY,
+        ttl: float = DEFAULT_DNS_TTL,
+    ):
+        self.concurrency = concurrency
+        self.ttl = ttl
+        self._cache: dict[str, tuple[float, list[str]]] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # Sent to scan worker processes along with the targets
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def resolve(self, name: str) -> list[str]:
+        """Return every address of `name`, or an empty list if it has none."""
+        with self._lock:
+            entry = self._cache.get(name)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        try:
+            infos = socket.getaddrinfo(name, None, type=socket.SOCK_STREAM)
+        except (socket.gaierror, UnicodeError):
+            addresses = []
+        else:
+            # Sorted so round-robin DNS still gives the same scan order
+            addresses = sorted({info[4][0] for info in infos}, key=_address_key)
+
+        with self._lock:
+            self._cache[name] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    def resolve_all(
+        self, names: Iterable[str], block: bool = True
+    ) -> Iterator[tuple[str, list[str]] | None]:
+        """Yield (name, addresses) as each lookup finishes.
+
+        Every lookup is submitted as soon as this is called, so the caller
+        can work on the names that resolve quickly while slow ones are still
+        running. Without `block`, None is yielded instead of waiting while
+        no lookup has finished.
+        """
+        names = list(names)
+        if not names:
+            return iter(())
+        pool = ThreadPoolExecutor(min(self.concurrency, len(names)))
+        futures = {pool.submit(self.resolve, name): name for name in names}
+        return self._results(pool, futures, block)
+
+    @staticmethod
+    def _results(
+        pool: ThreadPoolExecutor, futures: dict[Future, str], block: bool
+    ) -> Iterator[tuple[str, list[str]] | None]:
+        try:
+            pending = list(futures)
+            while pending:
+                if block:
+                    wait(pending, return_when=FIRST_COMPLETED)
+                # Lookups that finished together come out in input order
+                done = [future for future in pending if future.done()]
+                if not done:
+                    yield None
+                    continue
+                finished = set(done)
+                pending = [future for future in pending if future not in finished]
+                for future in done:
+                    yield futures[future], future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
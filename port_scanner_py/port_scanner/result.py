@@ -0,0 +1,23 @@
+import errno
+from typing import NamedTuple
+
+OPEN = "open"
+CLOSED = "closed"
+# Nothing answered: the probe timed out or an ICMP error came back
+FILTERED = "filtered"
+STATES = (OPEN, CLOSED, FILTERED)
+
+# Connect errors meaning no answer came in time, unlike ICMP errors, which
+# are an answer. A socket timeout makes connect_ex return EAGAIN
+TIMEOUT_ERRORS = frozenset((errno.EAGAIN, errno.EWOULDBLOCK, errno.ETIMEDOUT))
+
+
+class ScanResult(NamedTuple):
+    host: str
+    port: int
+    state: str
+    # Connect RTT in seconds, None when the host never answered
+    latency: float | None = None
+    # Service identified from the banner, and the banner itself
+    service: str | None = None
+    banner: str | None = None
@@ -1,23 +1,257 @@
-import socket
-import concurrent.futures
+import asyncio
+import inspect
+import logging
+import operator
+import sys
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Collection, Iterable
 
+from .checkpoint import Checkpoint
+from .discovery import DISCOVERY_CONCURRENCY, discover_hosts
+from .engines import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RETRIES,
+    ENGINES,
+    EngineOptions,
+    run_engine,
+)
+from .limits import max_concurrency
+from .output import OutputStage, TextWriter
+from .progress import PROGRESS_INTERVAL, ProgressReporter
+from .rate_limiter import RateLimiter
+from .result import ScanResult
+from .scheduler import DEFAULT_HOST_CONCURRENCY, ProbeScheduler
+from .sharding import run_sharded
+from .targets import HostTargets, parse_hosts
+from .thread_engine import scan_port  # noqa: F401
+from .timing import DEFAULT_TIMING, TIMING_PROFILES, HostTimeouts
 
-def scan_ports(hosts: list[str], ports: list[int], timeout: int = 1):
-    for host in hosts:
-        print("*" * 30)
-        pool = concurrent.futures.ThreadPoolExecutor(max_workers=8)
-        print(f"[+] Scanning for host {host}")
-        for port in ports:
-            pool.submit(scan_port, host, port, timeout)
-        pool.shutdown(wait=True)
-        print("*" * 30)
+logger = logging.getLogger(__name__)
 
-    print("Scan complete")
 
+def scan_ports(
+    hosts: Iterable[str],
+    ports: Collection[int],
+    timeout: float | None = None,
+    engine: str = "thread",
+    concurrency: int | None = None,
+    host_concurrency: int = DEFAULT_HOST_CONCURRENCY,
+    timing: str = DEFAULT_TIMING,
+    discovery: bool = True,
+    max_rate: float | None = None,
+    adaptive_rate: bool = False,
+    on_result: Callable[[ScanResult], None] | None = None,
+    checkpoint: Checkpoint | None = None,
+    workers: int = 1,
+    banner_timeout: float | None = None,
+    retries: int = DEFAULT_RETRIES,
+    progress: str | None = None,
+    progress_interval: float = PROGRESS_INTERVAL,
+    stop: threading.Event | None = None,
+    quiet: bool = False,
+    skip_probes: Collection[tuple[str, int]] | None = None,
+    only_probes: Collection[tuple[str, int]] | None = None,
+):
+    """Scan every port on every host, passing each ScanResult to `on_result`.
 
-def scan_port(host: str, port: int, timeout: int = 1):
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.settimeout(timeout)
-        result = s.connect_ex((host, port))
-        if result == 0:
-            print("\033[92m", f"[+] Port {port} is open")
+    Without a callback, open ports are printed to stdout. The other options
+    mirror the command line flags; setting `stop` ends the scan early, and
+    (host, port) pairs in `skip_probes` are not probed, and with
+    `only_probes` only the pairs in it are. Diagnostics are
+    logged, `quiet` leaves out the informational ones.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    if timing not in TIMING_PROFILES:
+        raise ValueError(f"Unknown timing profile: {timing}")
+    concurrency = concurrency or DEFAULT_CONCURRENCY[engine]
+    limit = max_concurrency(workers)
+    if concurrency > limit and not quiet:
+        logger.warning(
+            "[!] Concurrency capped at %d by the open file and local port limits",
+            limit,
+        )
+    concurrency = min(concurrency, limit)
+    timeouts = HostTimeouts(TIMING_PROFILES[timing], timeout)
+    limiter = RateLimiter(max_rate, adaptive_rate) if max_rate else None
+
+    if checkpoint and checkpoint.hosts is not None:
+        hosts = checkpoint.hosts
+    elif discovery:
+        hosts = discover_hosts(
+            hosts,
+            timeouts,
+            concurrency=min(DISCOVERY_CONCURRENCY, limit),
+            limiter=limiter,
+            stop=stop,
+        )
+        if stop and stop.is_set():
+            # Partial discovery results must not end up in the checkpoint
+            return
+        if not quiet:
+            logger.info("[+] %d host(s) up", len(hosts))
+        if checkpoint:
+            checkpoint.hosts = hosts
+            checkpoint.save()
+    elif isinstance(hosts, HostTargets) and (workers > 1 or checkpoint):
+        # Units are numbered by host, so every shard and every resumed run
+        # has to see the hosts in the same order
+        hosts = hosts.resolved()
+
+    stage = None
+    if on_result is None:
+        stage = OutputStage(TextWriter(sys.stdout))
+        on_result = stage.submit
+
+    skip_unit = on_unit_done = None
+    if checkpoint:
+        for result in checkpoint.results.values():
+            on_result(result)
+        report = on_result
+
+        def record(result: ScanResult):
+            checkpoint.add_result(result)
+            report(result)
+
+        on_result = record
+        skip_unit, on_unit_done = checkpoint.is_done, checkpoint.mark_done
+
+    reporter = None
+    if progress:
+        if only_probes is not None:
+            total = len(only_probes)
+        else:
+            total = operator.length_hint(hosts) * len(ports)
+        total = max(total - len(skip_probes or ()), 0)
+        reporter = ProgressReporter(total, progress, progress_interval)
+        deliver = on_result
+
+        def count(result: ScanResult):
+            reporter.record(result)
+            deliver(result)
+
+        on_result = count
+
+    options = EngineOptions(
+        engine=engine,
+        concurrency=concurrency,
+        host_concurrency=host_concurrency,
+        # Keep enough hosts active that the per-host cap never starves workers
+        max_active_hosts=2 * -(-concurrency // host_concurrency),
+        profile=timeouts.profile,
+        max_rate=max_rate,
+        adaptive_rate=adaptive_rate,
+        banner_timeout=banner_timeout,
+        retries=retries,
+    )
+
+    try:
+        if reporter:
+            reporter.start()
+        if workers > 1:
+            run_sharded(
+                hosts,
+                ports,
+                workers,
+                on_result,
+                options,
+                checkpoint.done if checkpoint else None,
+                on_unit_done,
+                stop,
+                skip_probes,
+                only_probes,
+            )
+        else:
+            scheduler = ProbeScheduler(
+                hosts,
+                ports,
+                host_concurrency,
+                options.max_active_hosts,
+                skip_unit=skip_unit,
+                on_unit_done=on_unit_done,
+                stop=stop,
+                skip_probes=skip_probes,
+                only_probes=only_probes,
+            )
+            if reporter:
+                reporter.in_flight = lambda: scheduler.in_flight
+            run_engine(scheduler, timeouts, on_result, options, limiter)
+    finally:
+        if reporter:
+            reporter.close()
+        if checkpoint:
+            checkpoint.save()
+        if stage:
+            stage.close()
+
+    if not quiet:
+        logger.info("Scan complete")
+
+
+class Scanner:
+    """Port scanner for embedding in long-lived programs.
+
+    Takes target specs (addresses, ranges, CIDR blocks and hostnames, or a
+    HostTargets from port_scanner.targets), ports and the options of
+    scan_ports. Invalid specs raise ValueError here, hostnames are resolved
+    once the scan runs. Results are never printed: `scan()` yields each
+    ScanResult, and `run()` hands them to `on_result`, which may be a
+    coroutine function. Warnings go to the port_scanner loggers. The scan
+    runs in a worker thread, so the event loop stays free while it is going.
+    """
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        hosts: Iterable[str] | HostTargets,
+        ports: Iterable[int],
+        on_result: Callable[[ScanResult], Awaitable[None] | None] | None = None,
+        **options,
+    ):
+        if isinstance(hosts, str):
+            raise TypeError("hosts must be a list of target specs, not a string")
+        self.hosts = hosts if isinstance(hosts, HostTargets) else parse_hosts(hosts)
+        self.ports = ports if isinstance(ports, Collection) else tuple(ports)
+        self.on_result = on_result
+        self.options = options
+
+    async def scan(self) -> AsyncIterator[ScanResult]:
+        """Yield results as they come in; closing the generator stops the scan
+        after the probes in flight have finished."""
+        loop = asyncio.get_running_loop()
+        results: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def on_result(result: ScanResult):
+            loop.call_soon_threadsafe(results.put_nowait, result)
+
+        def run():
+            try:
+                scan_ports(
+                    self.hosts,
+                    self.ports,
+                    on_result=on_result,
+                    stop=stop,
+                    quiet=True,
+                    **self.options,
+                )
+            finally:
+                loop.call_soon_threadsafe(results.put_nowait, self._DONE)
+
+        done = loop.run_in_executor(None, run)
+        try:
+            while (result := await results.get()) is not self._DONE:
+                yield result
+        finally:
+            stop.set()
+            # Raises whatever ended the scan
+            await done
+
+    async def run(self):
+        async for result in self.scan():
+            if self.on_result is None:
+                continue
+            outcome = self.on_result(result)
+            if inspect.isawaitable(outcome):
+                await outcome
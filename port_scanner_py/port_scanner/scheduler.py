@@ -0,0 +1,239 @@
+import bisect
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Collection, Container, Iterable, Iterator
+
+from .targets import HostTargets
+
+DEFAULT_HOST_CONCURRENCY = 64
+DEFAULT_CHUNK_SIZE = 1024
+# How often engines check for hosts whose lookup has finished
+RESOLVE_POLL_INTERVAL = 0.05
+
+
+def chunk_ports(
+    ports: Iterable[int], size: int = DEFAULT_CHUNK_SIZE
+) -> list[list[range]]:
+    """Split ports into chunks of `size` ports, each kept as a list of ranges.
+
+    Ports are expected in ascending order, as PortSet yields them; anything
+    else is sorted and deduplicated first.
+    """
+    if any(a >= b for a, b in itertools.pairwise(ports)):
+        ports = sorted(set(ports))
+
+    chunks: list[list[range]] = []
+    current: list[range] = []
+    count = 0
+    for port in ports:
+        if count == size:
+            chunks.append(current)
+            current, count = [], 0
+        if current and current[-1].stop == port:
+            current[-1] = range(current[-1].start, port + 1)
+        else:
+            current.append(range(port, port + 1))
+        count += 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class _HostWork:
+    def __init__(self, host: str, index: int):
+        self.host = host
+        self.index = index
+        self.chunk = -1
+        self.ports: Iterator[int] = iter(())
+        # Probes still in flight for each chunk that has been handed out
+        self.pending: dict[int, int] = {}
+        self.in_flight = 0
+        self.exhausted = False
+
+
+class ProbeScheduler:
+    """Interleaves (host, port) probes from many hosts in a single work queue.
+
+    Hosts are pulled lazily into a window of active hosts and served
+    round-robin, so a slow host only ever holds its own share of the
+    in-flight probes. The scheduler does no locking of its own; engines
+    call it from a single dispatcher and report completions with `release`.
+
+    Each host's ports are split into chunks, and every (host, chunk) pair
+    is a work unit numbered `host_index * len(chunks) + chunk`. Units for
+    which `skip_unit` returns True are never handed out, and `on_unit_done`
+    is called once every probe of a unit has been released. (host, port)
+    pairs in `skip_probes` are never handed out either, and with
+    `only_probes` nothing else is. Once `stop` is set
+    no new probes are handed out, and the scan finishes as soon as the
+    probes in flight are released.
+
+    Hostnames in HostTargets are never waited on: hosts are taken as their
+    lookups finish, and engines check back every `poll_interval` seconds
+    while some are still resolving.
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[str],
+        ports: Collection[int],
+        host_concurrency: int = DEFAULT_HOST_CONCURRENCY,
+        max_active_hosts: int = 16,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        skip_unit: Callable[[int], bool] | None = None,
+        on_unit_done: Callable[[int], None] | None = None,
+        stop: threading.Event | None = None,
+        skip_probes: Container[tuple[str, int]] | None = None,
+        only_probes: Container[tuple[str, int]] | None = None,
+    ):
+        self._hosts: Iterator[str | None] = (
+            hosts.poll() if isinstance(hosts, HostTargets) else iter(hosts)
+        )
+        self._host_count = 0
+        self._chunks = chunk_ports(ports, chunk_size)
+        self._chunk_starts = [chunk[0].start for chunk in self._chunks]
+        self._host_concurrency = host_concurrency
+        self._max_active_hosts = max_active_hosts
+        self._skip_unit = skip_unit
+        self._on_unit_done = on_unit_done
+        self._stop = stop
+        self._skip_probes = skip_probes
+        self._only_probes = only_probes
+        self._active: deque[_HostWork] = deque()
+        self._by_host: dict[str, _HostWork] = {}
+        self._hosts_exhausted = False
+        self._resolving = False
+        self.in_flight = 0
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop is not None and self._stop.is_set()
+
+    @property
+    def finished(self) -> bool:
+        if self.stopped:
+            return self.in_flight == 0
+        self._fill()
+        return self._hosts_exhausted and not self._active and self.in_flight == 0
+
+    @property
+    def poll_interval(self) -> float | None:
+        """How long engines may wait for a release before calling again, None
+        when nothing but a release can give them more work."""
+        return RESOLVE_POLL_INTERVAL if self._resolving else None
+
+    def unit_id(self, host_index: int, chunk: int) -> int:
+        return host_index * len(self._chunks) + chunk
+
+    def unit_of(self, host: str, port: int) -> int:
+        """Unit id of a probe that has been handed out and not yet released."""
+        chunk = bisect.bisect_right(self._chunk_starts, port) - 1
+        return self.unit_id(self._by_host[host].index, chunk)
+
+    def _fill(self):
+        self._resolving = False
+        while not self._hosts_exhausted and len(self._active) < self._max_active_hosts:
+            try:
+                host = next(self._hosts)
+            except StopIteration:
+                self._hosts_exhausted = True
+                return
+            if host is None:
+                # The remaining hosts are still being resolved
+                self._resolving = True
+                return
+            index = self._host_count
+            self._host_count += 1
+            if host in self._by_host:
+                # Same target listed twice, it is already being scanned. Its
+                # units still have to be reported, consumers that wait for
+                # units in order would otherwise wait on them forever
+                self._drop_host(index)
+                continue
+            work = _HostWork(host, index)
+            self._active.append(work)
+            self._by_host[host] = work
+
+    def _drop_host(self, index: int):
+        if not self._on_unit_done:
+            return
+        for chunk in range(len(self._chunks)):
+            unit = self.unit_id(index, chunk)
+            if not (self._skip_unit and self._skip_unit(unit)):
+                self._on_unit_done(unit)
+
+    def _next_port(self, work: _HostWork) -> int | None:
+        port = next(work.ports, None)
+        while port is None:
+            self._chunk_dispatched(work, work.chunk)
+            work.chunk += 1
+            while (
+                self._skip_unit
+                and work.chunk < len(self._chunks)
+                and self._skip_unit(self.unit_id(work.index, work.chunk))
+            ):
+                work.chunk += 1
+            if work.chunk >= len(self._chunks):
+                return None
+            work.pending[work.chunk] = 0
+            work.ports = (p for r in self._chunks[work.chunk] for p in r)
+            if self._skip_probes:
+                skip, host = self._skip_probes, work.host
+                work.ports = (p for p in work.ports if (host, p) not in skip)
+            if self._only_probes is not None:
+                only, host = self._only_probes, work.host
+                work.ports = (p for p in work.ports if (host, p) in only)
+            port = next(work.ports, None)
+        return port
+
+    def next_probe(self) -> tuple[str, int] | None:
+        """Return the next probe to dispatch, or None if every active host is
+        at its in-flight cap or there is no work left."""
+        if self.stopped:
+            return None
+        self._fill()
+        skipped = 0
+        while skipped < len(self._active):
+            work = self._active[0]
+            if work.in_flight >= self._host_concurrency:
+                self._active.rotate(-1)
+                skipped += 1
+                continue
+
+            port = self._next_port(work)
+            if port is None:
+                self._active.popleft()
+                work.exhausted = True
+                if work.in_flight == 0:
+                    del self._by_host[work.host]
+                self._fill()
+                skipped = 0
+                continue
+
+            self._active.rotate(-1)
+            work.pending[work.chunk] += 1
+            work.in_flight += 1
+            self.in_flight += 1
+            return work.host, port
+        return None
+
+    def release(self, host: str, port: int):
+        work = self._by_host[host]
+        work.in_flight -= 1
+        self.in_flight -= 1
+
+        chunk = bisect.bisect_right(self._chunk_starts, port) - 1
+        work.pending[chunk] -= 1
+        if chunk != work.chunk:
+            # Every probe of that chunk has already been handed out
+            self._chunk_dispatched(work, chunk)
+
+        if work.exhausted and work.in_flight == 0:
+            del self._by_host[host]
+
+    def _chunk_dispatched(self, work: _HostWork, chunk: int):
+        if work.pending.get(chunk) == 0:
+            del work.pending[chunk]
+            if self._on_unit_done:
+                self._on_unit_done(self.unit_id(work.index, chunk))
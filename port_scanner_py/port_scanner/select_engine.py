@@ -0,0 +1,207 @@
+import errno
+import heapq
+import itertools
+import selectors
+import socket
+import time
+from collections import deque
+from typing import Callable
+
+from .banner import BANNER_BYTES, with_banner
+from .limits import RESOURCE_ERRORS, ResourceBackoff, lower_concurrency
+from .rate_limiter import RateLimiter
+from .result import CLOSED, FILTERED, OPEN, TIMEOUT_ERRORS, ScanResult
+from .scheduler import ProbeScheduler
+from .timing import HostTimeouts
+
+
+class _Probe:
+    __slots__ = (
+        "host",
+        "port",
+        "attempt",
+        "sock",
+        "start",
+        "deadline",
+        "result",
+        "done",
+    )
+
+    def __init__(
+        self, host: str, port: int, attempt: int, sock: socket.socket, start: float
+    ):
+        self.host = host
+        self.port = port
+        self.attempt = attempt
+        self.sock = sock
+        self.start = start
+        self.deadline = 0.0
+        # Set once connected while the banner is still being read
+        self.result: ScanResult | None = None
+        self.done = False
+
+
+def run_select(
+    scheduler: ProbeScheduler,
+    timeouts: HostTimeouts,
+    on_result: Callable[[ScanResult], None],
+    concurrency: int = 1000,
+    limiter: RateLimiter | None = None,
+    banner_timeout: float | None = None,
+    retries: int = 0,
+):
+    """Scan from a single thread with non-blocking connects and a selector.
+
+    Every probe is a non-blocking socket registered for write readiness;
+    once writable, SO_ERROR tells whether the connect succeeded or was
+    refused. Deadlines sit in a heap and expired probes are reported as
+    timeouts, so no thread or coroutine is needed per probe. With a
+    `banner_timeout`, open sockets are re-registered for reading and the
+    first bytes they send are kept as the banner. Probes that timed out are
+    queued again with a fresh socket, ahead of new work, up to `retries`
+    times.
+    """
+    selector = selectors.DefaultSelector()
+    deadlines: list[tuple[float, int, _Probe]] = []
+    sequence = itertools.count()
+    # Probes to send again, already counted as in flight by the scheduler
+    retry_queue: deque[tuple[str, int, int]] = deque()
+    send_at = 0.0
+    backoff = ResourceBackoff()
+
+    def close(probe: _Probe):
+        probe.done = True
+        selector.unregister(probe.sock)
+        probe.sock.close()
+
+    def finish(probe: _Probe, result: ScanResult):
+        close(probe)
+        if result.latency is not None:
+            timeouts.observe(probe.host, result.latency)
+        try:
+            on_result(result)
+        finally:
+            scheduler.release(probe.host, probe.port)
+
+    def schedule(probe: _Probe, deadline: float):
+        # Earlier heap entries for the probe are dropped when they pop
+        probe.deadline = deadline
+        heapq.heappush(deadlines, (deadline, next(sequence), probe))
+
+    def answered(probe: _Probe, result: ScanResult, timed_out: bool = False):
+        if limiter:
+            limiter.record(timed_out)
+        # Only a missing answer is worth asking again
+        if timed_out and probe.attempt < retries:
+            close(probe)
+            retry_queue.append((probe.host, probe.port, probe.attempt + 1))
+            return
+        if result.state != OPEN or not banner_timeout:
+            finish(probe, result)
+            return
+        probe.result = result
+        selector.modify(probe.sock, selectors.EVENT_READ, probe)
+        schedule(probe, time.monotonic() + banner_timeout)
+
+    def read_banner(probe: _Probe):
+        try:
+            banner = probe.sock.recv(BANNER_BYTES)
+        except OSError:
+            banner = b""
+        finish(probe, with_banner(probe.result, banner))
+
+    def throttle(host: str, port: int, attempt: int):
+        # Out of fds or local ports: pause sending until some probes finish
+        nonlocal concurrency, send_at
+        retry_queue.appendleft((host, port, attempt))
+        concurrency = lower_concurrency(concurrency, scheduler.in_flight)
+        send_at = time.monotonic() + backoff.failed()
+
+    def start(host: str, port: int, attempt: int = 0) -> bool:
+        """Send a probe, returning False if it has to wait for resources."""
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+        except OSError as e:
+            if e.errno not in RESOURCE_ERRORS:
+                raise
+            throttle(host, port, attempt)
+            return False
+        sock.setblocking(False)
+        sent = time.monotonic()
+        err = sock.connect_ex((host, port))
+        if err in RESOURCE_ERRORS:
+            sock.close()
+            throttle(host, port, attempt)
+            return False
+        backoff.succeeded()
+
+        probe = _Probe(host, port, attempt, sock, sent)
+        selector.register(sock, selectors.EVENT_WRITE, probe)
+        if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            # Failed straight away, e.g. unreachable network
+            answered(probe, ScanResult(host, port, FILTERED))
+        else:
+            schedule(probe, sent + timeouts.timeout(host))
+        return True
+
+    try:
+        while True:
+            now = time.monotonic()
+            while now >= send_at:
+                if retry_queue:
+                    item = retry_queue.popleft()
+                else:
+                    item = (
+                        scheduler.next_probe()
+                        if scheduler.in_flight < concurrency
+                        else None
+                    )
+                    if item is None:
+                        break
+                if not start(*item):
+                    break
+                if limiter and (delay := limiter.reserve()):
+                    send_at = time.monotonic() + delay
+                    break
+
+            if scheduler.finished:
+                break
+
+            wait = max(deadlines[0][0] - now, 0) if deadlines else None
+            poll = scheduler.poll_interval
+            if poll is not None:
+                wait = poll if wait is None else min(wait, poll)
+            if send_at > now and (retry_queue or scheduler.in_flight < concurrency):
+                delay = send_at - now
+                wait = delay if wait is None else min(wait, delay)
+
+            for key, _ in selector.select(wait):
+                probe: _Probe = key.data
+                if probe.result is not None:
+                    read_banner(probe)
+                    continue
+                err = probe.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                rtt = time.monotonic() - probe.start
+                if err == 0:
+                    result = ScanResult(probe.host, probe.port, OPEN, rtt)
+                elif err == errno.ECONNREFUSED:
+                    result = ScanResult(probe.host, probe.port, CLOSED, rtt)
+                else:
+                    result = ScanResult(probe.host, probe.port, FILTERED)
+                answered(probe, result, err in TIMEOUT_ERRORS)
+
+            now = time.monotonic()
+            while deadlines and deadlines[0][0] <= now:
+                deadline, _, probe = heapq.heappop(deadlines)
+                if probe.done or deadline != probe.deadline:
+                    continue
+                if probe.result is not None:
+                    # Connected but the service sent nothing
+                    finish(probe, probe.result)
+                else:
+                    answered(probe, ScanResult(probe.host, probe.port, FILTERED), True)
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()  # type: ignore[union-attr]
+        selector.close()
@@ -0,0 +1,166 @@
+import multiprocessing
+import queue
+import signal
+import threading
+import traceback
+from typing import Callable, Collection, Container, Iterable
+
+from .engines import EngineOptions, run_engine
+from .intervals import IntervalSet
+from .rate_limiter import RateLimiter
+from .result import ScanResult
+from .scheduler import ProbeScheduler
+from .timing import HostTimeouts
+
+# Forking a process that already runs the output and progress threads can
+# deadlock the child, so workers always start from a fresh interpreter
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class _OrderedMerge:
+    """Re-orders per-unit result batches from the shards by unit id."""
+
+    def __init__(
+        self,
+        on_result: Callable[[ScanResult], None],
+        on_unit_done: Callable[[int], None] | None,
+        skipped: IntervalSet,
+    ):
+        self._on_result = on_result
+        self._on_unit_done = on_unit_done
+        self._skipped = skipped
+        self._pending: dict[int, list[ScanResult]] = {}
+        self._next = skipped.next_missing(0)
+
+    def add(self, unit: int, results: list[ScanResult]):
+        self._pending[unit] = results
+        while self._next in self._pending:
+            self._emit(self._next)
+            self._next = self._skipped.next_missing(self._next + 1)
+
+    def flush(self):
+        for unit in sorted(self._pending):
+            self._emit(unit)
+
+    def _emit(self, unit: int):
+        for result in self._pending.pop(unit):
+            self._on_result(result)
+        if self._on_unit_done:
+            self._on_unit_done(unit)
+
+
+def _run_shard(
+    shard: int,
+    workers: int,
+    hosts: Iterable[str],
+    ports: Collection[int],
+    options: EngineOptions,
+    skipped: IntervalSet,
+    skip_probes: Container[tuple[str, int]] | None,
+    only_probes: Container[tuple[str, int]] | None,
+    results: multiprocessing.Queue,
+):
+    # Ctrl-C reaches the whole process group, let the parent handle it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    error = None
+    try:
+        timeouts = HostTimeouts(options.profile)
+        limiter = None
+        if options.max_rate:
+            limiter = RateLimiter(options.max_rate / workers, options.adaptive_rate)
+        batches: dict[int, list[ScanResult]] = {}
+
+        def on_result(result: ScanResult):
+            unit = scheduler.unit_of(result.host, result.port)
+            batches.setdefault(unit, []).append(result)
+
+        def on_unit_done(unit: int):
+            batch = sorted(batches.pop(unit, []), key=lambda r: r.port)
+            results.put(("unit", unit, batch))
+
+        scheduler = ProbeScheduler(
+            hosts,
+            ports,
+            options.host_concurrency,
+            options.max_active_hosts,
+            skip_unit=lambda u: u % workers != shard or u in skipped,
+            on_unit_done=on_unit_done,
+            skip_probes=skip_probes,
+            only_probes=only_probes,
+        )
+        run_engine(scheduler, timeouts, on_result, options, limiter)
+    except BaseException:
+        error = traceback.format_exc()
+    results.put(("exit", shard, error))
+
+
+def run_sharded(
+    hosts: Iterable[str],
+    ports: Collection[int],
+    workers: int,
+    on_result: Callable[[ScanResult], None],
+    options: EngineOptions,
+    skipped: IntervalSet | None = None,
+    on_unit_done: Callable[[int], None] | None = None,
+    stop: threading.Event | None = None,
+    skip_probes: Container[tuple[str, int]] | None = None,
+    only_probes: Container[tuple[str, int]] | None = None,
+):
+    """Scan with one engine per process, each owning every `workers`-th unit.
+
+    Shards send a batch of results per finished work unit, and batches are
+    reported in unit order so the output matches a single-process scan.
+    Setting `stop` terminates the workers, dropping unfinished units.
+    """
+    skipped = skipped or IntervalSet()
+    results: multiprocessing.Queue = _CONTEXT.Queue()
+    processes = [
+        _CONTEXT.Process(
+            target=_run_shard,
+            args=(
+                shard,
+                workers,
+                hosts,
+                ports,
+                options,
+                skipped,
+                skip_probes,
+                only_probes,
+                results,
+            ),
+            daemon=True,
+        )
+        for shard in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    merge = _OrderedMerge(on_result, on_unit_done, skipped)
+    running = set(range(workers))
+    try:
+        while running and not (stop and stop.is_set()):
+            try:
+                message = results.get(timeout=1)
+            except queue.Empty:
+                for shard in running:
+                    if not processes[shard].is_alive():
+                        raise RuntimeError(
+                            f"Scan worker {shard} exited with code "
+                            f"{processes[shard].exitcode}"
+                        )
+                continue
+
+            if message[0] == "unit":
+                _, unit, batch = message
+                merge.add(unit, batch)
+            else:
+                _, shard, error = message
+                if error:
+                    raise RuntimeError(f"Scan worker {shard} failed:\n{error}")
+                running.discard(shard)
+        merge.flush()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
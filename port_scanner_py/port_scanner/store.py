@@ -0,0 +1,144 @@
+import sqlite3
+import threading
+import time
+from typing import Container
+
+from .result import OPEN, ScanResult
+
+BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    service TEXT,
+    banner TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    changed_at REAL NOT NULL,
+    PRIMARY KEY (host, port)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_changed_at ON results (changed_at);
+CREATE TABLE IF NOT EXISTS sweeps (
+    scan TEXT PRIMARY KEY,
+    finished_at REAL NOT NULL
+);
+"""
+
+UPSERT = """
+INSERT INTO results
+    (host, port, state, service, banner, first_seen, last_seen, changed_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (host, port) DO UPDATE SET
+    state = excluded.state,
+    service = COALESCE(excluded.service, results.service),
+    banner = COALESCE(excluded.banner, results.banner),
+    last_seen = excluded.last_seen,
+    changed_at = CASE
+        WHEN results.state != excluded.state THEN excluded.last_seen
+        ELSE results.changed_at
+    END
+"""
+
+
+class ResultStore:
+    """Latest state of every port that has ever been seen open, in SQLite.
+
+    Ports that were never open are not stored, which keeps the database
+    small even for full sweeps; a closed or filtered result is only kept
+    when the port used to be open. `previous` holds the states as they were
+    when the store was opened, so results can be diffed against them.
+    """
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self.previous: dict[tuple[str, int], str] = {
+            (host, port): state
+            for host, port, state in self._db.execute(
+                "SELECT host, port, state FROM results"
+            )
+        }
+        self._pending: list[tuple] = []
+        self._lock = threading.Lock()
+
+    def changed(self, result: ScanResult) -> bool:
+        """Whether the port is newly open, or was open and no longer is."""
+        previous = self.previous.get((result.host, result.port))
+        if result.state == OPEN:
+            return previous != OPEN
+        return previous == OPEN
+
+    def record(self, result: ScanResult):
+        if result.state != OPEN and (result.host, result.port) not in self.previous:
+            return
+        now = time.time()
+        with self._lock:
+            self._pending.append(
+                (
+                    result.host,
+                    result.port,
+                    result.state,
+                    result.service,
+                    result.banner,
+                    now,
+                    now,
+                    now,
+                )
+            )
+            if len(self._pending) >= BATCH_SIZE:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            with self._db:
+                self._db.executemany(UPSERT, self._pending)
+            self._pending.clear()
+
+    def known_ports(
+        self, hosts: Container[str], ports: Container[int]
+    ) -> dict[str, list[int]]:
+        """Ports among `ports` that were ever open on each host among `hosts`,
+        hosts that changed most recently first."""
+        rows = self._db.execute(
+            "SELECT host, port FROM results ORDER BY changed_at DESC"
+        )
+        known: dict[str, list[int]] = {}
+        others: set[str] = set()
+        for host, port in rows:
+            if host in others:
+                continue
+            if host not in known and host not in hosts:
+                others.add(host)
+                continue
+            if port in ports:
+                known.setdefault(host, []).append(port)
+        return {host: sorted(host_ports) for host, host_ports in known.items()}
+
+    def last_sweep(self, scan: str) -> float | None:
+        row = self._db.execute(
+            "SELECT finished_at FROM sweeps WHERE scan = ?", (scan,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def record_sweep(self, scan: str):
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sweeps (scan, finished_at) VALUES (?, ?)",
+                (scan, time.time()),
+            )
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,270 @@
+import ipaddress
+import logging
+import sys
+from typing import Iterable, Iterator
+
+from .intervals import IntervalSet
+from .resolver import Resolver
+
+logger = logging.getLogger(__name__)
+
+
+class HostRange:
+    """Contiguous block of addresses stored as its first and last integer.
+
+    Addresses are only turned into strings while iterating, so a /8 costs
+    the same memory as a single host.
+    """
+
+    def __init__(self, first: int, last: int, version: int = 4):
+        self.first = first
+        self.last = last
+        self.version = version
+
+    @classmethod
+    def from_network(cls, net: ipaddress.IPv4Network | ipaddress.IPv6Network):
+        first, last = int(net.network_address), int(net.broadcast_address)
+        # Same addresses as net.hosts(): skip network/broadcast on IPv4 and the
+        # subnet-router anycast address on IPv6, except for point-to-point nets
+        if net.version == 4 and net.prefixlen < 31:
+            first, last = first + 1, last - 1
+        elif net.version == 6 and net.prefixlen < 127:
+            first += 1
+        return cls(first, last, net.version)
+
+    @property
+    def num_hosts(self) -> int:
+        return max(self.last - self.first + 1, 0)
+
+    def __contains__(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return ip.version == self.version and self.first <= int(ip) <= self.last
+
+    def __iter__(self) -> Iterator[str]:
+        return self.addresses()
+
+    def addresses(self, excluded: IntervalSet | None = None) -> Iterator[str]:
+        """Yield every address of the range, jumping over `excluded`."""
+        address_class = (
+            ipaddress.IPv4Address if self.version == 4 else ipaddress.IPv6Address
+        )
+        start = self.first
+        if excluded:
+            for skip_start, skip_end in excluded.within(self.first, self.last):
+                for i in range(start, skip_start):
+                    yield str(address_class(i))
+                start = skip_end + 1
+        for i in range(start, self.last + 1):
+            yield str(address_class(i))
+
+
+class HostExclusions:
+    """Addresses that are never scanned.
+
+    Kept as one IntervalSet per IP version, so checking an address is a
+    bisect however many entries were excluded, and iterating a range only
+    walks the excluded intervals that overlap it.
+    """
+
+    def __init__(self, ranges: Iterable[HostRange] = ()):
+        by_version: dict[int, list[tuple[int, int]]] = {4: [], 6: []}
+        for r in ranges:
+            by_version[r.version].append((r.first, r.last))
+        self.intervals = {v: IntervalSet(iv) for v, iv in by_version.items()}
+
+    def __bool__(self) -> bool:
+        return any(self.intervals.values())
+
+    def __contains__(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return int(ip) in self.intervals[ip.version]
+
+    def count_within(self, r: HostRange) -> int:
+        return self.intervals[r.version].count_within(r.first, r.last)
+
+
+class HostTargets:
+    """Lazy iterator over every address of the parsed targets.
+
+    Hostnames are resolved concurrently once iteration starts. Addresses
+    of ranges come first, in target order, then those of each hostname as
+    soon as its lookup finishes, so scanning never waits on a slow lookup
+    while other targets are ready.
+    """
+
+    def __init__(
+        self,
+        targets: list[HostRange | str],
+        resolver: Resolver | None = None,
+        exclusions: HostExclusions | None = None,
+    ):
+        self.targets = targets
+        self.resolver = resolver or Resolver()
+        self.exclusions = exclusions or HostExclusions()
+
+    @property
+    def ranges(self) -> list[HostRange]:
+        return [t for t in self.targets if isinstance(t, HostRange)]
+
+    @property
+    def names(self) -> list[str]:
+        return [t for t in self.targets if isinstance(t, str)]
+
+    @property
+    def num_hosts(self) -> int:
+        # Until they are resolved, hostnames are counted as one address each
+        return sum(
+            r.num_hosts - self.exclusions.count_within(r) for r in self.ranges
+        ) + len(self.names)
+
+    def __contains__(self, address: str) -> bool:
+        if address in self.exclusions:
+            return False
+        if any(address in r for r in self.ranges):
+            return True
+        return any(address in self.resolver.resolve(name) for name in self.names)
+
+    def __iter__(self) -> Iterator[str]:
+        return (a for a in self._addresses(block=True) if a is not None)
+
+    def poll(self) -> Iterator[str | None]:
+        """Iterate like `iter()`, but yield None instead of waiting for a
+        lookup, for callers that must not block."""
+        return self._addresses(block=False)
+
+    def _addresses(self, block: bool) -> Iterator[str | None]:
+        resolved = self.resolver.resolve_all(self.names, block)
+        for r in self.ranges:
+            yield from r.addresses(self.exclusions.intervals[r.version])
+        for item in resolved:
+            if item is None:
+                yield None
+                continue
+            name, addresses = item
+            if not addresses:
+                logger.warning("[-] Could not resolve %s", name)
+            yield from (a for a in addresses if a not in self.exclusions)
+
+    def resolved(self) -> "HostTargets":
+        """Targets with every hostname replaced by its addresses.
+
+        Iterating them never waits on DNS and always gives the same order,
+        which sharded and checkpointed scans need to number their units.
+        """
+        answers = dict(filter(None, self.resolver.resolve_all(self.names)))
+        targets: list[HostRange | str] = []
+        for target in self.targets:
+            if isinstance(target, HostRange):
+                targets.append(target)
+                continue
+            if not answers[target]:
+                logger.warning("[-] Could not resolve %s", target)
+            for address in answers[target]:
+                ip = ipaddress.ip_address(address)
+                targets.append(HostRange(int(ip), int(ip), ip.version))
+        return HostTargets(targets, self.resolver, self.exclusions)
+
+    def __length_hint__(self) -> int:
+        # IPv6 networks can hold more hosts than a Py_ssize_t
+        return min(self.num_hosts, sys.maxsize)
+
+
+def _is_ipv4(value: str) -> bool:
+    try:
+        ipaddress.IPv4Address(value)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_host(value: str) -> HostRange | str:
+    """Parse an address, range, CIDR block or hostname, ValueError if invalid."""
+    # CIDR block
+    if "/" in value:
+        try:
+            net = ipaddress.ip_network(value, strict=False)
+            return HostRange.from_network(net)
+        except ValueError:
+            raise ValueError(f"Invalid CIDR value: {value}")
+
+    # IP Range, other values with a "-" are hostnames
+    elif "-" in value and _is_ipv4(value.split("-", 1)[0]):
+        base, end = value.split("-", 1)
+        try:
+            start_ip = int(ipaddress.IPv4Address(base))
+            start, end = int(base.split(".")[3]), int(end)
+        except ValueError:
+            raise ValueError(f"Invalid IP range format: {value}")
+        if end < start or end > 255:
+            raise ValueError(f"Invalid range end: {value}")
+        return HostRange(start_ip, start_ip + end - start)
+
+    # Single IP
+    else:
+        try:
+            # Check if it's a valid IP address
+            ip = ipaddress.ip_address(value)
+            return HostRange(int(ip), int(ip), ip.version)
+        except ValueError:
+            # Not an IP, keep the hostname and resolve it when scanning
+            if not value or any(c.isspace() for c in value):
+                raise ValueError(f"Invalid IP address or hostname: {value}")
+            return value
+
+
+def parse_hosts(
+    hosts: Iterable[str],
+    resolver: Resolver | None = None,
+    exclusions: HostExclusions | None = None,
+) -> HostTargets:
+    return HostTargets([parse_host(host) for host in hosts], resolver, exclusions)
+
+
+def load_exclude_file(path: str) -> list[str]:
+    entries = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                entries.append(line)
+    return entries
+
+
+def parse_exclusions(
+    values: Iterable[str], resolver: Resolver | None = None
+) -> HostExclusions:
+    ranges: list[HostRange] = []
+    names: list[str] = []
+    for value in values:
+        if "/" in value:
+            # The whole block, network and broadcast addresses included
+            try:
+                net = ipaddress.ip_network(value, strict=False)
+            except ValueError:
+                raise ValueError(f"Invalid CIDR value: {value}")
+            ranges.append(
+                HostRange(
+                    int(net.network_address), int(net.broadcast_address), net.version
+                )
+            )
+            continue
+        target = parse_host(value)
+        if isinstance(target, HostRange):
+            ranges.append(target)
+        else:
+            names.append(target)
+
+    for name, addresses in (resolver or Resolver()).resolve_all(names):
+        if not addresses:
+            # Scanning anyway could probe exactly what had to be left alone
+            raise ValueError(f"Could not resolve excluded host: {name}")
+        for address in addresses:
+            ip = ipaddress.ip_address(address)
+            ranges.append(HostRange(int(ip), int(ip), ip.version))
+    return HostExclusions(ranges)
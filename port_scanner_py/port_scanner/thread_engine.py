@@ -0,0 +1,120 @@
+import errno
+import os
+import socket
+import threading
+import time
+import concurrent.futures
+from typing import Callable
+
+from .banner import BANNER_BYTES, with_banner
+from .limits import RESOURCE_ERRORS, ResourceBackoff
+from .rate_limiter import RateLimiter
+from .result import CLOSED, FILTERED, OPEN, TIMEOUT_ERRORS, ScanResult
+from .scheduler import ProbeScheduler
+from .timing import HostTimeouts
+
+
+def run_threads(
+    scheduler: ProbeScheduler,
+    timeouts: HostTimeouts,
+    on_result: Callable[[ScanResult], None],
+    concurrency: int = 8,
+    limiter: RateLimiter | None = None,
+    banner_timeout: float | None = None,
+    retries: int = 0,
+):
+    cond = threading.Condition()
+    backoff = ResourceBackoff()
+    # Errors from probes or on_result, the first one ends the scan
+    failures: list[Exception] = []
+
+    def connect(host: str, port: int) -> tuple[ScanResult, bool]:
+        while True:
+            try:
+                result = _scan_port(host, port, timeouts.timeout(host), banner_timeout)
+            except OSError as e:
+                if e.errno not in RESOURCE_ERRORS:
+                    raise
+                # Out of fds or local ports, wait for other probes to finish
+                time.sleep(backoff.failed())
+                continue
+            backoff.succeeded()
+            return result
+
+    def probe(host: str, port: int):
+        try:
+            for attempt in range(retries + 1):
+                if attempt and limiter and (delay := limiter.reserve()):
+                    time.sleep(delay)
+                result, timed_out = connect(host, port)
+                if limiter:
+                    limiter.record(timed_out)
+                # Only a missing answer is worth asking again
+                if not timed_out:
+                    break
+            if result.latency is not None:
+                timeouts.observe(host, result.latency)
+            on_result(result)
+        except Exception as e:
+            failures.append(e)
+        finally:
+            with cond:
+                scheduler.release(host, port)
+                cond.notify()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        with cond:
+            while not failures:
+                item = (
+                    scheduler.next_probe()
+                    if scheduler.in_flight < concurrency
+                    else None
+                )
+                if item is None:
+                    if scheduler.finished:
+                        break
+                    cond.wait(scheduler.poll_interval)
+                    continue
+                if limiter and (delay := limiter.reserve()):
+                    # Sleep without holding the lock so workers can finish
+                    cond.release()
+                    try:
+                        time.sleep(delay)
+                    finally:
+                        cond.acquire()
+                pool.submit(probe, *item)
+    if failures:
+        raise failures[0]
+
+
+def scan_port(
+    host: str, port: int, timeout: float = 1, banner_timeout: float | None = None
+) -> ScanResult:
+    """Connect to a single port, reading its banner if `banner_timeout` is set."""
+    return _scan_port(host, port, timeout, banner_timeout)[0]
+
+
+def _scan_port(
+    host: str, port: int, timeout: float, banner_timeout: float | None
+) -> tuple[ScanResult, bool]:
+    """scan_port, also telling whether the connect timed out."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        start = time.monotonic()
+        result = s.connect_ex((host, port))
+        rtt = time.monotonic() - start
+        if result in RESOURCE_ERRORS:
+            raise OSError(result, os.strerror(result))
+        if result == 0:
+            banner = b""
+            if banner_timeout:
+                s.settimeout(banner_timeout)
+                try:
+                    banner = s.recv(BANNER_BYTES)
+                except OSError:
+                    pass
+            return with_banner(ScanResult(host, port, OPEN, rtt), banner), False
+        if result == errno.ECONNREFUSED:
+            return ScanResult(host, port, CLOSED, rtt), False
+        return ScanResult(host, port, FILTERED), result in TIMEOUT_ERRORS
@@ -0,0 +1,112 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+class TimingProfile(NamedTuple):
+    initial_timeout: float
+    min_timeout: float
+    max_timeout: float
+    # Longest host discovery waits on a host that has not answered yet
+    discovery_timeout: float = 0.5
+
+
+TIMING_PROFILES = {
+    "polite": TimingProfile(
+        initial_timeout=2.0, min_timeout=0.5, max_timeout=5.0, discovery_timeout=1.0
+    ),
+    "normal": TimingProfile(
+        initial_timeout=1.0, min_timeout=0.1, max_timeout=3.0, discovery_timeout=0.5
+    ),
+    "aggressive": TimingProfile(
+        initial_timeout=0.5, min_timeout=0.05, max_timeout=1.25, discovery_timeout=0.25
+    ),
+    "insane": TimingProfile(
+        initial_timeout=0.25, min_timeout=0.03, max_timeout=0.5, discovery_timeout=0.15
+    ),
+}
+DEFAULT_TIMING = "normal"
+
+
+class RttEstimator:
+    """Smoothed RTT and variance as in RFC 6298, used to derive a timeout."""
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    def __init__(self):
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+
+    def observe(self, rtt: float):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(
+                self.srtt - rtt
+            )
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+
+    def timeout(self) -> float | None:
+        if self.srtt is None:
+            return None
+        return self.srtt + self.K * self.rttvar
+
+
+class HostTimeouts:
+    """Per-host connect timeouts that follow the RTTs measured for each host.
+
+    Only the most recently used hosts are remembered, which is plenty since
+    the scheduler keeps a small window of hosts active at a time.
+    """
+
+    def __init__(
+        self,
+        profile: TimingProfile = TIMING_PROFILES[DEFAULT_TIMING],
+        timeout: float | None = None,
+        max_hosts: int = 4096,
+    ):
+        if timeout is not None:
+            # An explicit timeout is both the starting point and the ceiling
+            profile = TimingProfile(
+                initial_timeout=timeout,
+                min_timeout=min(profile.min_timeout, timeout),
+                max_timeout=timeout,
+                discovery_timeout=min(profile.discovery_timeout, timeout),
+            )
+        self.profile = profile
+        self._max_hosts = max_hosts
+        self._estimators: OrderedDict[str, RttEstimator] = OrderedDict()
+        self._lock = threading.Lock()
+        self._unsampled_cap: float | None = None
+
+    def capped(self, cap: float) -> "HostTimeouts":
+        """View sharing these RTTs that waits at most `cap` seconds on hosts
+        no RTT has been measured for yet."""
+        view = copy.copy(self)
+        view._unsampled_cap = cap
+        return view
+
+    def timeout(self, host: str) -> float:
+        with self._lock:
+            estimator = self._estimators.get(host)
+            value = estimator.timeout() if estimator else None
+        if value is None:
+            if self._unsampled_cap is not None:
+                return min(self.profile.initial_timeout, self._unsampled_cap)
+            return self.profile.initial_timeout
+        return min(max(value, self.profile.min_timeout), self.profile.max_timeout)
+
+    def observe(self, host: str, rtt: float):
+        with self._lock:
+            estimator = self._estimators.get(host)
+            if estimator is None:
+                estimator = self._estimators[host] = RttEstimator()
+                if len(self._estimators) > self._max_hosts:
+                    self._estimators.popitem(last=False)
+            else:
+                self._estimators.move_to_end(host)
+            estimator.observe(rtt)
@@ -0,0 +1,22 @@
+import socket
+
+import pytest
+
+
+@pytest.fixture
+def unanswered_port():
+    """A port on localhost whose SYNs are dropped: its backlog is full."""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(0)
+    port = server.getsockname()[1]
+    clients = []
+    while True:
+        client = socket.socket()
+        client.settimeout(0.2)
+        clients.append(client)
+        if client.connect_ex(("127.0.0.1", port)) != 0:
+            break
+    yield port
+    for s in (server, *clients):
+        s.close()
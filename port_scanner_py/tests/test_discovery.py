@@ -0,0 +1,29 @@
+import time
+
+from port_scanner.discovery import discover_hosts
+from port_scanner.timing import TIMING_PROFILES, HostTimeouts
+
+
+class CountingTimeouts(HostTimeouts):
+    def __init__(self):
+        super().__init__()
+        self.answers: list[str] = []
+
+    def observe(self, host, rtt):
+        self.answers.append(host)
+        super().observe(host, rtt)
+
+
+def test_hosts_are_not_probed_once_they_answered():
+    timeouts = CountingTimeouts()
+    assert discover_hosts(["127.0.0.1"], timeouts, ports=range(1, 11)) == ["127.0.0.1"]
+    # The first two probes go out together, the rest are skipped
+    assert timeouts.answers == ["127.0.0.1", "127.0.0.1"]
+
+
+def test_silent_hosts_get_the_discovery_timeout(unanswered_port):
+    profile = TIMING_PROFILES["normal"]
+    start = time.monotonic()
+    assert discover_hosts(["127.0.0.1"], HostTimeouts(profile), [unanswered_port]) == []
+    elapsed = time.monotonic() - start
+    assert profile.discovery_timeout <= elapsed < profile.initial_timeout
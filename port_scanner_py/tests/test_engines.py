@@ -0,0 +1,61 @@
+import socket
+
+import pytest
+
+from port_scanner.engines import ENGINES, EngineOptions, run_engine
+from port_scanner.rate_limiter import RateLimiter
+from port_scanner.result import FILTERED, OPEN
+from port_scanner.scheduler import ProbeScheduler
+from port_scanner.timing import HostTimeouts
+
+TIMEOUT = 0.2
+
+
+class RecordingLimiter(RateLimiter):
+    """Never waits, and keeps what every attempt was recorded as."""
+
+    def __init__(self):
+        super().__init__(1e9, adaptive=True)
+        self.attempts: list[bool] = []
+
+    def record(self, timed_out: bool):
+        self.attempts.append(timed_out)
+
+
+def scan(engine, host, ports, retries):
+    results = []
+    limiter = RecordingLimiter()
+    run_engine(
+        ProbeScheduler([host], ports),
+        HostTimeouts(timeout=TIMEOUT),
+        results.append,
+        EngineOptions(engine=engine, concurrency=4, retries=retries),
+        limiter,
+    )
+    return results, limiter.attempts
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_timeouts_are_retried(engine, unanswered_port):
+    results, attempts = scan(engine, "127.0.0.1", [unanswered_port], retries=2)
+    assert [r.state for r in results] == [FILTERED]
+    assert attempts == [True, True, True]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_unreachable_is_an_answer(engine):
+    # Sending to the broadcast address fails straight away, like an ICMP error
+    results, attempts = scan(engine, "255.255.255.255", [80], retries=2)
+    assert [r.state for r in results] == [FILTERED]
+    assert attempts == [False]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_open_port(engine):
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        port = server.getsockname()[1]
+        results, attempts = scan(engine, "127.0.0.1", [port], retries=2)
+    assert [r.state for r in results] == [OPEN]
+    assert attempts == [False]
@@ -0,0 +1,42 @@
+import argparse
+
+import pytest
+
+from cli.host_parser import parse_exclusions, parse_host, parse_hosts
+
+
+class StaticResolver:
+    def __init__(self, addresses: dict[str, list[str]]):
+        self.addresses = addresses
+
+    def resolve(self, name):
+        return self.addresses.get(name, [])
+
+    def resolve_all(self, names):
+        return ((name, self.resolve(name)) for name in names)
+
+
+def test_exclusions_are_skipped_and_not_counted():
+    exclusions = parse_exclusions(["10.0.0.0/30", "10.0.0.9", "10.0.0.12-14"])
+    targets = parse_hosts(["10.0.0.0/28"], exclusions=exclusions)
+    expected = [f"10.0.0.{i}" for i in (4, 5, 6, 7, 8, 10, 11)]
+    assert list(targets) == expected
+    assert targets.num_hosts == len(expected)
+    assert "10.0.0.9" not in targets and "10.0.0.10" in targets
+
+
+def test_excluded_hostnames_are_resolved():
+    resolver = StaticResolver({"gw.example": ["10.0.0.1"]})
+    exclusions = parse_exclusions(["gw.example"], resolver)
+    targets = parse_hosts(["10.0.0.0-3"], exclusions=exclusions)
+    assert list(targets) == ["10.0.0.0", "10.0.0.2", "10.0.0.3"]
+
+
+def test_unresolved_exclusion_is_an_error():
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_exclusions(["missing.example"], StaticResolver({}))
+
+
+def test_hyphenated_hostname():
+    assert parse_host("my-host.example") == "my-host.example"
+    assert parse_host("10.0.0.5-7").num_hosts == 3
@@ -0,0 +1,59 @@
+import random
+
+from port_scanner.intervals import IntervalSet
+
+
+def test_constructor_merges_intervals():
+    intervals = IntervalSet([(10, 12), (1, 3), (4, 5), (2, 2), (20, 19)])
+    assert list(intervals) == [(1, 5), (10, 12)]
+    assert intervals.size == 8
+    assert not IntervalSet()
+
+
+def test_add_merges_neighbours():
+    intervals = IntervalSet()
+    for value in (5, 7, 6, 1, 3, 2, 7):
+        intervals.add(value)
+    assert list(intervals) == [(1, 3), (5, 7)]
+    intervals.add(4)
+    assert list(intervals) == [(1, 7)]
+
+
+def test_add_matches_a_set():
+    rng = random.Random(0)
+    intervals, values = IntervalSet(), set()
+    for _ in range(2000):
+        value = rng.randrange(500)
+        intervals.add(value)
+        values.add(value)
+    assert intervals.size == len(values)
+    assert all((v in intervals) == (v in values) for v in range(-1, 501))
+    # Stored intervals stay disjoint and never touch
+    bounds = list(intervals)
+    assert all(end + 1 < start for (_, end), (start, _) in zip(bounds, bounds[1:]))
+
+
+def test_next_missing():
+    intervals = IntervalSet([(1, 3), (5, 7)])
+    assert intervals.next_missing(0) == 0
+    assert intervals.next_missing(1) == 4
+    assert intervals.next_missing(3) == 4
+    assert intervals.next_missing(4) == 4
+    assert intervals.next_missing(6) == 8
+    assert intervals.next_missing(100) == 100
+
+
+def test_within_clips_to_the_bounds():
+    intervals = IntervalSet([(1, 3), (5, 7), (10, 20)])
+    assert list(intervals.within(2, 12)) == [(2, 3), (5, 7), (10, 12)]
+    assert list(intervals.within(4, 4)) == []
+    assert list(intervals.within(6, 6)) == [(6, 6)]
+    assert list(intervals.within(21, 30)) == []
+    assert list(IntervalSet().within(0, 10)) == []
+
+
+def test_count_within():
+    intervals = IntervalSet([(1, 3), (5, 7), (10, 20)])
+    assert intervals.count_within(0, 100) == intervals.size == 17
+    assert intervals.count_within(2, 12) == 8
+    assert intervals.count_within(8, 9) == 0
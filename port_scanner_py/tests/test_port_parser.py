@@ -0,0 +1,56 @@
+import argparse
+
+import pytest
+
+from cli.port_parser import PortSet, parse_port, parse_ports
+
+
+def test_overlapping_and_adjacent_ranges_merge():
+    ports = PortSet([range(1, 65536), range(80, 81), range(443, 444)])
+    assert ports.ranges() == [range(1, 65536)]
+    assert len(ports) == 65535
+
+    ports = PortSet([range(20, 23), range(23, 26), range(30, 31), range(21, 24)])
+    assert ports.ranges() == [range(20, 26), range(30, 31)]
+    assert list(ports) == [20, 21, 22, 23, 24, 25, 30]
+
+
+def test_duplicates_and_empty_ranges():
+    ports = PortSet([range(80, 81), range(80, 81), range(5, 5)])
+    assert ports.ranges() == [range(80, 81)]
+    assert len(ports) == 1
+    assert len(PortSet()) == 0
+
+
+def test_contains():
+    ports = PortSet([range(20, 26), range(30, 31)])
+    assert 20 in ports and 25 in ports and 30 in ports
+    assert 19 not in ports and 26 not in ports and 31 not in ports
+    assert "20" not in ports
+
+
+def test_equality_ignores_input_order():
+    assert PortSet([range(1, 3), range(3, 5)]) == PortSet([range(1, 5)])
+    assert PortSet([range(1, 3)]) != PortSet([range(1, 4)])
+
+
+def test_parse_port():
+    assert parse_port("80") == range(80, 81)
+    assert parse_port("1-1024") == range(1, 1025)
+    for value in ("65536", "-1", "10-5", "1-2-3", "a", "1-b"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_port(value)
+
+
+def test_parse_ports_merges_arguments():
+    assert parse_ports(["1-100", "50", "101"]) == PortSet([range(1, 102)])
+
+
+def test_parse_ports_file(tmp_path):
+    ports_file = tmp_path / "ports.txt"
+    ports_file.write_text("22,80\n\n79-81\n443\n")
+    assert parse_ports(ports_file=str(ports_file)).ranges() == [
+        range(22, 23),
+        range(79, 82),
+        range(443, 444),
+    ]
@@ -0,0 +1,71 @@
+import pytest
+
+from port_scanner import rate_limiter
+from port_scanner.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    return now
+
+
+def record(limiter, results, timeouts):
+    for i in range(results):
+        limiter.record(i < timeouts)
+
+
+def test_probes_are_spaced_by_the_rate(clock):
+    limiter = RateLimiter(10)
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(0.1)
+    assert limiter.reserve() == pytest.approx(0.2)
+    clock[0] = 1.0
+    assert limiter.reserve() == 0
+
+
+def test_burst_is_bounded(clock):
+    limiter = RateLimiter(100)
+    clock[0] = 60.0
+    waits = [limiter.reserve() for _ in range(20)]
+    # A tenth of a second worth of probes goes out at once, no more
+    assert waits.count(0) == 10
+    assert waits[-1] == pytest.approx(0.1)
+
+
+def test_rate_is_fixed_unless_adaptive(clock):
+    limiter = RateLimiter(100)
+    record(limiter, 100, 0)
+    record(limiter, 100, 100)
+    assert limiter.rate == 100
+
+
+def test_timeout_spike_halves_the_rate_then_recovers(clock):
+    limiter = RateLimiter(100, adaptive=True)
+    record(limiter, 100, 0)
+    assert limiter.rate == 100
+    record(limiter, 100, 50)
+    assert limiter.rate == 50
+    record(limiter, 100, 0)
+    assert limiter.rate == pytest.approx(55)
+    for _ in range(20):
+        record(limiter, 100, 0)
+    assert limiter.rate == 100
+
+
+def test_rate_never_drops_below_the_minimum(clock):
+    limiter = RateLimiter(100, adaptive=True, min_rate=30)
+    record(limiter, 100, 0)
+    record(limiter, 100, 100)
+    assert limiter.rate == 50
+    record(limiter, 100, 100)
+    record(limiter, 100, 100)
+    assert limiter.rate == 30
+
+
+def test_steady_filtering_does_not_keep_the_rate_down(clock):
+    limiter = RateLimiter(100, adaptive=True)
+    for _ in range(50):
+        record(limiter, 100, 90)
+    assert limiter.rate == 100
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from port_scanner.discovery import discover_hosts
+from port_scanner.resolver import Resolver
+from port_scanner.scanner import scan_ports
+from port_scanner.targets import parse_hosts
+from port_scanner.timing import HostTimeouts
+
+SLOW_LOOKUP = 1.0
+
+
+class SlowResolver(Resolver):
+    """Resolves `slow.test` after SLOW_LOOKUP seconds, other names at once."""
+
+    def resolve(self, name):
+        if name == "slow.test":
+            time.sleep(SLOW_LOOKUP)
+            return ["127.0.0.2"]
+        return ["127.0.0.3"] if name == "fast.test" else []
+
+
+def test_resolve_all_yields_in_completion_order():
+    results = list(SlowResolver().resolve_all(["slow.test", "fast.test"]))
+    assert results == [("fast.test", ["127.0.0.3"]), ("slow.test", ["127.0.0.2"])]
+
+
+def test_resolve_all_without_blocking():
+    results = SlowResolver().resolve_all(["slow.test"], block=False)
+    assert next(results) is None
+    time.sleep(SLOW_LOOKUP + 0.2)
+    assert next(results) == ("slow.test", ["127.0.0.2"])
+
+
+def test_targets_resolved_keeps_target_order():
+    targets = parse_hosts(["slow.test", "127.0.0.1", "fast.test"], SlowResolver())
+    assert list(targets) == ["127.0.0.1", "127.0.0.3", "127.0.0.2"]
+    assert list(targets.resolved()) == ["127.0.0.2", "127.0.0.1", "127.0.0.3"]
+
+
+@pytest.mark.parametrize("engine", ["thread", "async", "select"])
+def test_scan_does_not_wait_on_a_slow_lookup(engine):
+    targets = parse_hosts(["slow.test", "127.0.0.1"], SlowResolver())
+    start = time.monotonic()
+    arrived = {}
+
+    def on_result(result):
+        arrived.setdefault(result.host, time.monotonic() - start)
+
+    scan_ports(
+        targets,
+        range(1, 21),
+        engine=engine,
+        discovery=False,
+        retries=0,
+        on_result=on_result,
+        quiet=True,
+    )
+    assert arrived["127.0.0.1"] < SLOW_LOOKUP / 2
+    assert arrived["127.0.0.2"] >= SLOW_LOOKUP
+
+
+def test_discovery_takes_hosts_as_they_resolve():
+    targets = parse_hosts(["slow.test", "127.0.0.1"], SlowResolver())
+    start = time.monotonic()
+    assert discover_hosts(targets, HostTimeouts()) == ["127.0.0.1", "127.0.0.2"]
+    assert time.monotonic() - start < SLOW_LOOKUP + 0.5
@@ -0,0 +1,149 @@
+import threading
+
+from cli.port_parser import PortSet
+from port_scanner.scheduler import ProbeScheduler, chunk_ports
+
+
+def test_chunk_ports_keeps_runs_as_ranges():
+    ports = PortSet([range(1, 6), range(10, 11), range(20, 23)])
+    assert chunk_ports(ports, size=4) == [
+        [range(1, 5)],
+        [range(5, 6), range(10, 11), range(20, 22)],
+        [range(22, 23)],
+    ]
+
+
+def test_chunk_ports_sizes():
+    chunks = chunk_ports(range(1, 1001), size=300)
+    assert [sum(map(len, chunk)) for chunk in chunks] == [300, 300, 300, 100]
+    assert [port for chunk in chunks for r in chunk for port in r] == list(
+        range(1, 1001)
+    )
+    assert chunk_ports([], size=10) == []
+
+
+def test_chunk_ports_sorts_and_deduplicates():
+    assert chunk_ports([443, 80, 81, 80, 22], size=10) == [
+        [range(22, 23), range(80, 82), range(443, 444)]
+    ]
+
+
+def drain(scheduler: ProbeScheduler) -> list[tuple[str, int]]:
+    """Hand out and release every probe, one at a time."""
+    probes = []
+    while (probe := scheduler.next_probe()) is not None:
+        probes.append(probe)
+        scheduler.release(*probe)
+    assert scheduler.finished
+    return probes
+
+
+def test_hosts_are_served_round_robin():
+    scheduler = ProbeScheduler(["a", "b"], [1, 2])
+    assert drain(scheduler) == [("a", 1), ("b", 1), ("a", 2), ("b", 2)]
+
+
+def test_per_host_cap():
+    scheduler = ProbeScheduler(["a", "b"], range(10), host_concurrency=2)
+    handed_out = []
+    while (probe := scheduler.next_probe()) is not None:
+        handed_out.append(probe)
+    assert sorted(handed_out) == [("a", 0), ("a", 1), ("b", 0), ("b", 1)]
+    assert scheduler.in_flight == 4
+
+    scheduler.release("a", 0)
+    assert scheduler.next_probe() == ("a", 2)
+    assert scheduler.next_probe() is None
+
+
+def test_active_host_window():
+    scheduler = ProbeScheduler(["a", "b", "c"], [1, 2], max_active_hosts=2)
+    probes = [scheduler.next_probe() for _ in range(4)]
+    assert {host for host, _ in probes} == {"a", "b"}
+    for probe in probes:
+        scheduler.release(*probe)
+    assert drain(scheduler) == [("c", 1), ("c", 2)]
+
+
+def test_units_are_done_once_every_probe_is_released():
+    done = []
+    scheduler = ProbeScheduler(
+        ["a", "b"], range(4), chunk_size=2, on_unit_done=done.append
+    )
+    probes = []
+    while (probe := scheduler.next_probe()) is not None:
+        probes.append(probe)
+    assert done == []
+    # Units are host_index * chunks + chunk
+    assert [scheduler.unit_of(*probe) for probe in probes] == [0, 2, 0, 2, 1, 3, 1, 3]
+    for probe in reversed(probes):
+        scheduler.release(*probe)
+    assert sorted(done) == [0, 1, 2, 3]
+    assert scheduler.finished
+
+
+def test_skipped_units_are_not_handed_out_or_reported():
+    done = []
+    scheduler = ProbeScheduler(
+        ["a", "b"],
+        range(4),
+        chunk_size=2,
+        skip_unit=lambda unit: unit in (1, 2),
+        on_unit_done=done.append,
+    )
+    assert sorted(drain(scheduler)) == [("a", 0), ("a", 1), ("b", 2), ("b", 3)]
+    assert sorted(done) == [0, 3]
+
+
+def test_skip_probes():
+    done = []
+    scheduler = ProbeScheduler(
+        ["a", "b"],
+        range(4),
+        chunk_size=2,
+        on_unit_done=done.append,
+        skip_probes={("a", 1), ("b", 2), ("b", 3)},
+    )
+    assert sorted(drain(scheduler)) == [
+        ("a", 0),
+        ("a", 2),
+        ("a", 3),
+        ("b", 0),
+        ("b", 1),
+    ]
+    # A unit with every probe skipped is still done
+    assert sorted(done) == [0, 1, 2, 3]
+
+
+def test_only_probes():
+    done = []
+    scheduler = ProbeScheduler(
+        ["a", "b"],
+        range(4),
+        chunk_size=2,
+        on_unit_done=done.append,
+        only_probes={("a", 3), ("b", 0), ("c", 1)},
+    )
+    assert sorted(drain(scheduler)) == [("a", 3), ("b", 0)]
+    assert sorted(done) == [0, 1, 2, 3]
+
+
+def test_duplicate_target_reports_its_units():
+    done = []
+    scheduler = ProbeScheduler(
+        ["a", "a", "b"], range(4), chunk_size=2, on_unit_done=done.append
+    )
+    probes = drain(scheduler)
+    assert len(probes) == 8
+    assert sorted(done) == list(range(6))
+
+
+def test_stop_hands_out_nothing_more():
+    stop = threading.Event()
+    scheduler = ProbeScheduler(["a"], range(10), stop=stop)
+    probe = scheduler.next_probe()
+    stop.set()
+    assert scheduler.next_probe() is None
+    assert not scheduler.finished
+    scheduler.release(*probe)
+    assert scheduler.finished
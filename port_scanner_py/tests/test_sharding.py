@@ -0,0 +1,28 @@
+from port_scanner.engines import EngineOptions
+from port_scanner.result import CLOSED
+from port_scanner.sharding import run_sharded
+
+
+def test_duplicate_host_units_are_reported():
+    hosts = ["127.0.0.1", "127.0.0.1", "127.0.0.2"]
+    ports = range(1, 4)
+    results, done = [], []
+    run_sharded(
+        hosts,
+        ports,
+        2,
+        results.append,
+        EngineOptions(retries=0),
+        on_unit_done=done.append,
+    )
+    # One unit per host, the duplicate reports its unit without results
+    assert done == [0, 1, 2]
+    assert [(r.host, r.port) for r in results] == [
+        ("127.0.0.1", 1),
+        ("127.0.0.1", 2),
+        ("127.0.0.1", 3),
+        ("127.0.0.2", 1),
+        ("127.0.0.2", 2),
+        ("127.0.0.2", 3),
+    ]
+    assert all(r.state == CLOSED for r in results)
@@ -0,0 +1,24 @@
+from port_scanner.result import CLOSED, OPEN, ScanResult
+from port_scanner.store import ResultStore
+
+
+def test_known_ports_are_kept_per_host(tmp_path):
+    with ResultStore(str(tmp_path / "scan.db")) as store:
+        store.record(ScanResult("10.0.0.1", 22, OPEN))
+        store.record(ScanResult("10.0.0.1", 80, OPEN))
+        store.record(ScanResult("10.0.0.2", 443, OPEN))
+        store.record(ScanResult("10.0.0.3", 8080, OPEN))
+        # Never open, so never stored
+        store.record(ScanResult("10.0.0.2", 25, CLOSED))
+
+    with ResultStore(str(tmp_path / "scan.db")) as store:
+        known = store.known_ports({"10.0.0.1", "10.0.0.2"}, range(1, 1024))
+    assert known == {"10.0.0.1": [22, 80], "10.0.0.2": [443]}
+
+
+def test_known_ports_outside_the_scan_are_left_out(tmp_path):
+    with ResultStore(str(tmp_path / "scan.db")) as store:
+        store.record(ScanResult("10.0.0.1", 22, OPEN))
+        store.record(ScanResult("10.0.0.2", 8080, OPEN))
+        store.flush()
+        assert store.known_ports({"10.0.0.1", "10.0.0.2"}, [22]) == {"10.0.0.1": [22]}
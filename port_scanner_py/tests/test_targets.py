@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from port_scanner import Scanner
+from port_scanner.targets import HostRange, parse_exclusions, parse_host, parse_hosts
+
+
+@pytest.mark.parametrize(
+    "value", ["10.0.0.0/33", "10.0.0.5-300", "10.0.0.5-x", "a b", ""]
+)
+def test_invalid_specs_raise_value_error(value):
+    with pytest.raises(ValueError):
+        parse_host(value)
+
+
+def test_parse_host():
+    assert parse_host("localhost") == "localhost"
+    target = parse_host("10.0.0.0/30")
+    assert isinstance(target, HostRange)
+    assert list(target) == ["10.0.0.1", "10.0.0.2"]
+
+
+def test_unresolved_exclusion_raises_value_error():
+    with pytest.raises(ValueError):
+        parse_exclusions(["no-such-host.invalid"])
+
+
+def test_scanner_checks_targets_when_created():
+    with pytest.raises(ValueError):
+        Scanner(["127.0.0.1", "not a host"], [1])
+
+
+def test_scanner_resolves_hostnames():
+    scanner = Scanner(["localhost"], [1], retries=0)
+
+    async def scan():
+        return [result async for result in scanner.scan()]
+
+    results = asyncio.run(scan())
+    assert {(r.port, r.state) for r in results} == {(1, "closed")}
+    assert results[0].host in parse_hosts(["localhost"])
+
+
+def test_unresolved_target_is_logged(caplog):
+    targets = parse_hosts(["no-such-host.invalid", "127.0.0.1"])
+    assert list(targets) == ["127.0.0.1"]
+    assert "no-such-host.invalid" in caplog.text
@@ -0,0 +1,77 @@
+import pytest
+
+from port_scanner.timing import TIMING_PROFILES, HostTimeouts, RttEstimator
+
+
+def test_rtt_estimator():
+    estimator = RttEstimator()
+    assert estimator.timeout() is None
+    estimator.observe(0.1)
+    assert estimator.srtt == pytest.approx(0.1)
+    assert estimator.rttvar == pytest.approx(0.05)
+    assert estimator.timeout() == pytest.approx(0.3)
+    estimator.observe(0.2)
+    assert estimator.srtt == pytest.approx(0.1125)
+    assert estimator.rttvar == pytest.approx(0.0625)
+
+
+def test_rtt_estimator_settles_on_a_steady_rtt():
+    estimator = RttEstimator()
+    for _ in range(100):
+        estimator.observe(0.05)
+    assert estimator.timeout() == pytest.approx(0.05, rel=1e-3)
+
+
+def test_host_timeouts_start_from_the_profile():
+    profile = TIMING_PROFILES["normal"]
+    timeouts = HostTimeouts(profile)
+    assert timeouts.timeout("10.0.0.1") == profile.initial_timeout
+
+
+def test_host_timeouts_are_clamped():
+    profile = TIMING_PROFILES["normal"]
+    timeouts = HostTimeouts(profile)
+    timeouts.observe("fast", 0.001)
+    timeouts.observe("slow", 10)
+    assert timeouts.timeout("fast") == profile.min_timeout
+    assert timeouts.timeout("slow") == profile.max_timeout
+
+
+def test_host_timeouts_are_per_host():
+    timeouts = HostTimeouts(TIMING_PROFILES["normal"])
+    timeouts.observe("a", 0.2)
+    assert timeouts.timeout("a") == pytest.approx(0.6)
+    assert timeouts.timeout("b") == TIMING_PROFILES["normal"].initial_timeout
+
+
+def test_explicit_timeout_is_the_ceiling():
+    timeouts = HostTimeouts(TIMING_PROFILES["normal"], timeout=0.5)
+    assert timeouts.timeout("a") == 0.5
+    timeouts.observe("a", 2)
+    assert timeouts.timeout("a") == 0.5
+
+
+def test_least_recently_used_host_is_forgotten():
+    timeouts = HostTimeouts(TIMING_PROFILES["normal"], max_hosts=2)
+    timeouts.observe("a", 0.2)
+    timeouts.observe("b", 0.2)
+    timeouts.observe("a", 0.2)
+    timeouts.observe("c", 0.2)
+    initial = TIMING_PROFILES["normal"].initial_timeout
+    assert timeouts.timeout("b") == initial
+    assert timeouts.timeout("a") != initial
+
+
+def test_capped_view_shares_the_samples():
+    profile = TIMING_PROFILES["normal"]
+    timeouts = HostTimeouts(profile)
+    capped = timeouts.capped(profile.discovery_timeout)
+    assert capped.timeout("a") == profile.discovery_timeout
+    assert timeouts.timeout("a") == profile.initial_timeout
+    capped.observe("a", 0.2)
+    assert capped.timeout("a") == timeouts.timeout("a") == pytest.approx(0.6)
+
+
+def test_explicit_timeout_caps_discovery():
+    timeouts = HostTimeouts(TIMING_PROFILES["normal"], timeout=0.2)
+    assert timeouts.capped(timeouts.profile.discovery_timeout).timeout("a") == 0.2
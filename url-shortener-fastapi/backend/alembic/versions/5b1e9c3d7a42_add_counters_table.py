@@ -0,0 +1,35 @@
+"""Add counters table
+
+Revision ID: 5b1e9c3d7a42
+Revises: 8feed164d75a
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1e9c3d7a42"
+down_revision: Union[str, Sequence[str], None] = "8feed164d75a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    counters = op.create_table(
+        "counters",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.bulk_insert(counters, [{"name": "short_codes", "value": 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("counters")
@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+import os
+import string
+
+from dotenv import load_dotenv
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import CounterSession
+from app.models import Counter, Url
+from app.utils import generate_random_string
+
+load_dotenv()
+SHORT_CODE_ALLOCATOR = os.getenv("SHORT_CODE_ALLOCATOR", "counter")
+SHORT_CODE_BLOCK_SIZE = int(os.getenv("SHORT_CODE_BLOCK_SIZE", 1000))
+SHORT_CODE_KEY = os.getenv("SHORT_CODE_KEY", "")
+
+BASE62 = string.digits + string.ascii_letters
+COUNTER_NAME = "short_codes"
+# Permuted codes are padded to a fixed length, 62**9 > 2**48
+PERMUTED_BITS = 48
+PERMUTED_LENGTH = 9
+FEISTEL_ROUNDS = 4
+
+
+def base62(value: int, length: int = 1) -> str:
+    digits = []
+    while value or len(digits) < length:
+        value, digit = divmod(value, 62)
+        digits.append(BASE62[digit])
+    return "".join(reversed(digits))
+
+
+class FeistelPermutation:
+    """Keyed bijection on [0, 2**bits), distinct inputs give distinct outputs."""
+
+    def __init__(self, key: str, bits: int = PERMUTED_BITS):
+        self.key = hashlib.sha256(key.encode()).digest()
+        self.half = bits // 2
+        self.mask = (1 << self.half) - 1
+
+    def _round(self, value: int, i: int) -> int:
+        digest = hashlib.blake2b(
+            value.to_bytes(8, "big") + bytes([i]), key=self.key, digest_size=8
+        ).digest()
+        return int.from_bytes(digest, "big") & self.mask
+
+    def __call__(self, value: int) -> int:
+        left, right = value >> self.half, value & self.mask
+        for i in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ self._round(right, i)
+        return (left << self.half) | right
+
+
+class ShortCodeAllocator:
+    async def allocate(self, db: AsyncSession, count: int = 1) -> list[str]:
+        raise NotImplementedError
+
+
+class RandomAllocator(ShortCodeAllocator):
+    """Random codes, checked against the existing ones with one query."""
+
+    async def allocate(self, db: AsyncSession, count: int = 1) -> list[str]:
+        codes: set[str] = set()
+        while len(codes) < count:
+            candidates = {generate_random_string() for _ in range(count - len(codes))}
+            candidates -= codes
+            stmt = select(Url.short_url).where(Url.short_url.in_(candidates))
+            codes |= candidates - set(await db.scalars(stmt))
+        return list(codes)
+
+
+class CounterAllocator(ShortCodeAllocator):
+    """Codes from a shared database counter, never reused.
+
+    Each worker reserves `block_size` counter values at a time, so most
+    allocations need no query at all. With a key, values are passed through
+    a keyed permutation so consecutive codes look unrelated. The key must
+    not change once codes have been issued, or new codes can collide with
+    existing ones.
+    """
+
+    def __init__(self, block_size: int = SHORT_CODE_BLOCK_SIZE, key: str = ""):
+        self.block_size = block_size
+        self.permutation = FeistelPermutation(key) if key else None
+        self._next = self._end = 0
+        self._lock = asyncio.Lock()
+
+    async def _reserve(self, count: int) -> tuple[int, int]:
+        size = max(count, self.block_size)
+        stmt = (
+            update(Counter)
+            .where(Counter.name == COUNTER_NAME)
+            .values(value=Counter.value + size)
+            .returning(Counter.value)
+        )
+        # Committed on its own, a rolled back request must not free the block.
+        # Only one reservation runs at a time, under the lock
+        async with CounterSession() as db, db.begin():
+            end = (await db.execute(stmt)).scalar_one()
+        return end - size, end
+
+    def encode(self, value: int) -> str:
+        if self.permutation is None:
+            return base62(value)
+        if value >> PERMUTED_BITS:
+            raise RuntimeError("Short code counter exhausted")
+        return base62(self.permutation(value), PERMUTED_LENGTH)
+
+    async def allocate(self, db: AsyncSession, count: int = 1) -> list[str]:
+        values: list[int] = []
+        async with self._lock:
+            while len(values) < count:
+                if self._next == self._end:
+                    self._next, self._end = await self._reserve(count - len(values))
+                take = min(self._end - self._next, count - len(values))
+                values.extend(range(self._next, self._next + take))
+                self._next += take
+        return [self.encode(value) for value in values]
+
+
+ALLOCATORS = ("counter", "sequential", "random")
+
+
+def get_allocator(name: str) -> ShortCodeAllocator:
+    if name == "counter":
+        # A key that changes, like the JWT secret on rotation, would let new
+        # codes collide with existing ones
+        if not SHORT_CODE_KEY:
+            raise ValueError("SHORT_CODE_KEY must be set for the counter allocator")
+        return CounterAllocator(key=SHORT_CODE_KEY)
+    if name == "sequential":
+        return CounterAllocator()
+    if name == "random":
+        return RandomAllocator()
+    raise ValueError(f"Unknown short code allocator: {name}")
+
+
+short_code_allocator = get_allocator(SHORT_CODE_ALLOCATOR)
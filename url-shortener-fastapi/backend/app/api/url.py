@@ -1,25 +1,56 @@
-from typing import List
+import os
+from itertools import batched
+from typing import AsyncIterator, List
 
+from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import RedirectResponse
-from sqlalchemy import select, text
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.allocator import short_code_allocator
 from app.api.auth import get_current_user
+from app.cache import CachedUrl, redirect_cache
 from app.db import get_db
 from app.models import Url, User
 from app.schemas import CreateUrlDTO, GetUrlDTO
-from app.utils import generate_random_string, get_expiration_time
+from app.utils import get_expiration_time, get_time
+from app.visits import Visit, visit_recorder
+
+load_dotenv()
+BULK_SHORTEN_MAX_URLS = int(os.getenv("BULK_SHORTEN_MAX_URLS", 50000))
+BULK_SHORTEN_CHUNK_SIZE = int(os.getenv("BULK_SHORTEN_CHUNK_SIZE", 1000))
+BULK_SHORTEN_MAX_BYTES = int(os.getenv("BULK_SHORTEN_MAX_BYTES", 32 * 1024 * 1024))
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl")
+
+# The body is parsed by hand, declare it for the docs. CreateUrlDTO is
+# already in the components through /shorten.
+BULK_SHORTEN_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            content_type: {
+                "schema": {
+                    "type": "array",
+                    "items": {"$ref": "#/components/schemas/CreateUrlDTO"},
+                }
+            }
+            for content_type in ("application/json", *NDJSON_TYPES)
+        },
+    }
+}
 
 router = APIRouter(prefix="/urls", tags=["urls"])
 
 
 @router.get("/get_user_urls", response_model=List[GetUrlDTO])
 async def get_user_urls(
-    user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
 ):
     stmt = select(Url).where(Url.user_id == user.id)
-    urls = db.execute(stmt).scalars().all()
+    urls = (await db.scalars(stmt)).all()
     return urls
 
 
@@ -27,15 +58,11 @@ async def get_user_urls(
 async def shorten(
     url: CreateUrlDTO,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if url.ttl_minutes > user.max_ttl_minutes:  # pyright: ignore
         raise HTTPException(status_code=400, detail="TTL minutes exceeds user limit")
-    short_code = generate_random_string()
-    stmt = select(Url).where(Url.short_url == short_code)
-    while db.execute(stmt).scalars().first():
-        short_code = generate_random_string()
-
+    (short_code,) = await short_code_allocator.allocate(db)
     expiry = get_expiration_time(url.ttl_minutes)
     new_url = Url(
         short_url=short_code,
@@ -44,12 +71,99 @@ async def shorten(
         expires_at=expiry,
     )
     db.add(new_url)
-    db.commit()
+    await db.commit()
     return new_url
 
 
+async def read_body(request: Request) -> AsyncIterator[bytes]:
+    """Stream the body, failing as soon as it exceeds BULK_SHORTEN_MAX_BYTES."""
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > BULK_SHORTEN_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Request body too large")
+        yield chunk
+
+
+async def read_ndjson(request: Request) -> AsyncIterator[tuple[int, bytes]]:
+    buffer = b""
+    line_number = 0
+    async for chunk in read_body(request):
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+async def parse_bulk_urls(request: Request) -> list[CreateUrlDTO]:
+    """A JSON array of URLs, or one URL per line for NDJSON bodies."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in NDJSON_TYPES:
+        body = b"".join([chunk async for chunk in read_body(request)])
+        try:
+            urls = TypeAdapter(List[CreateUrlDTO]).validate_json(body)
+        except ValidationError as e:
+            errors = e.errors(include_url=False)
+            for error in errors:
+                error["loc"] = ("body", *error["loc"])
+            raise RequestValidationError(errors)
+        if len(urls) > BULK_SHORTEN_MAX_URLS:
+            raise HTTPException(status_code=413, detail="Too many URLs")
+        return urls
+
+    urls = []
+    async for line_number, line in read_ndjson(request):
+        if len(urls) == BULK_SHORTEN_MAX_URLS:
+            raise HTTPException(status_code=413, detail="Too many URLs")
+        try:
+            urls.append(CreateUrlDTO.model_validate_json(line))
+        except ValidationError as e:
+            errors = e.errors(include_url=False)
+            for error in errors:
+                error["loc"] = ("body", line_number, *error["loc"])
+            raise RequestValidationError(errors)
+    return urls
+
+
+@router.post(
+    "/shorten/bulk", response_model=List[GetUrlDTO], openapi_extra=BULK_SHORTEN_BODY
+)
+async def shorten_bulk(
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    urls = await parse_bulk_urls(request)
+    if not urls:
+        return []
+    if max(url.ttl_minutes for url in urls) > user.max_ttl_minutes:  # pyright: ignore
+        raise HTTPException(status_code=400, detail="TTL minutes exceeds user limit")
+
+    short_codes = await short_code_allocator.allocate(db, len(urls))
+    rows = [
+        {
+            "short_url": short_code,
+            "original_url": str(url.original_url),
+            "user_id": user.id,
+            "expires_at": get_expiration_time(url.ttl_minutes),
+            "click_count": 0,
+        }
+        for url, short_code in zip(urls, short_codes)
+    ]
+    for chunk in batched(rows, BULK_SHORTEN_CHUNK_SIZE):
+        await db.execute(insert(Url), list(chunk))
+    await db.commit()
+    return [GetUrlDTO.model_validate(row) for row in rows]
+
+
 @router.get("/{short_code}")
-async def get_url(short_code: str, request: Request, db: Session = Depends(get_db)):
+async def get_url(
+    short_code: str, request: Request, db: AsyncSession = Depends(get_db)
+):
     host = request.headers.get("host")
     x_forwarded_for = request.headers.get("x-forwarded-for")
     if x_forwarded_for:
@@ -57,35 +171,38 @@ async def get_url(short_code: str, request: Request, db: Session = Depends(get_d
 
     user_agent = request.headers.get("user-agent")
 
-    stmt = text(
-        "SELECT get_url_by_short_code_and_update(:short_code, :host, :user_agent)"
-    )
-    url = db.execute(
-        stmt, {"short_code": short_code, "host": host, "user_agent": user_agent}
-    ).scalar_one_or_none()
-
-    if not url or url == "url not found":
-        raise HTTPException(status_code=404, detail="URL not found")
-
-    if url == "url has expired":
+    url = redirect_cache.get(short_code)
+    if url is None:
+        stmt = select(Url.id, Url.original_url, Url.expires_at).where(
+            Url.short_url == short_code
+        )
+        row = (await db.execute(stmt)).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="URL not found")
+        url = CachedUrl(*row)
+        redirect_cache.put(short_code, url)
+
+    now = get_time()
+    if url.is_expired(now):
         raise HTTPException(status_code=410, detail="URL expired")
 
-    db.commit()
-    return RedirectResponse(url)
+    await visit_recorder.record(Visit.create(url.id, host, user_agent, now))
+    return RedirectResponse(url.original_url)
 
 
 @router.delete("/{short_code}")
 async def delete_url(
     short_code: str,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     stmt = select(Url).where(Url.short_url == short_code)
-    url = db.execute(stmt).scalars().first()
+    url = (await db.scalars(stmt)).first()
     if not url:
         raise HTTPException(status_code=404, detail="URL not found")
     if url.user_id != user.id:  # pyright: ignore
         raise HTTPException(status_code=403, detail="Not authorized")
-    db.delete(url)
-    db.commit()
+    await db.delete(url)
+    await db.commit()
+    redirect_cache.invalidate(short_code)
     return {"message": "URL deleted"}
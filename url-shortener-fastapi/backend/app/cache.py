@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+REDIRECT_CACHE_SIZE = int(os.getenv("REDIRECT_CACHE_SIZE", 10000))
+REDIRECT_CACHE_TTL_SECONDS = float(os.getenv("REDIRECT_CACHE_TTL_SECONDS", 300))
+
+
+class CachedUrl(NamedTuple):
+    id: int
+    original_url: str
+    expires_at: datetime | None
+
+    def is_expired(self, now: datetime) -> bool:
+        if self.expires_at is None:
+            return False
+        expires_at = self.expires_at
+        # SQLite hands back naive datetimes, they are stored in UTC
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return expires_at <= now
+
+
+class RedirectCache:
+    """Bounded LRU mapping short codes to their target URL.
+
+    Entries live for at most `ttl` seconds, which bounds how stale a URL
+    deleted by another worker process can get. Expiry is checked against
+    each URL's own expires_at on every hit, so an expired link is never
+    redirected from the cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = REDIRECT_CACHE_SIZE,
+        ttl: float = REDIRECT_CACHE_TTL_SECONDS,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, CachedUrl]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, short_code: str) -> CachedUrl | None:
+        with self._lock:
+            entry = self._entries.get(short_code)
+            if entry is None:
+                return None
+            cached_until, url = entry
+            if cached_until <= time.monotonic():
+                del self._entries[short_code]
+                return None
+            self._entries.move_to_end(short_code)
+            return url
+
+    def put(self, short_code: str, url: CachedUrl):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[short_code] = (time.monotonic() + self.ttl, url)
+            self._entries.move_to_end(short_code)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, short_code: str):
+        with self._lock:
+            self._entries.pop(short_code, None)
+
+
+redirect_cache = RedirectCache()
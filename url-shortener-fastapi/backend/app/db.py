@@ -1,20 +1,37 @@
 import os
-from sqlalchemy import create_engine
 from dotenv import load_dotenv
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# Async drivers for the sync URLs also used by alembic
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def get_async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver and parsed.get_driver_name() != driver:
+        parsed = parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}")
+    return parsed.render_as_string(hide_password=False)
 
 
 load_dotenv()
 database_url = os.getenv("DATABASE_URL", "sqlite:///url_shortener.db")
-engine = create_engine(database_url)
+engine = create_async_engine(get_async_url(database_url))
+
 
+# Objects stay usable after commit, lazy loads are not possible with asyncio
+Session = async_sessionmaker(bind=engine, expire_on_commit=False)
 
-Session = sessionmaker(bind=engine)
+# Short code blocks are reserved while the request already holds a pooled
+# connection, so they get a connection of their own: with a shared pool,
+# requests waiting on the reservation could hold every connection it needs
+counter_engine = create_async_engine(
+    get_async_url(database_url), pool_size=1, max_overflow=0
+)
+CounterSession = async_sessionmaker(bind=counter_engine)
 
 
-def get_db():
-    db = Session()
-    try:
+async def get_db():
+    async with Session() as db:
         yield db
-    finally:
-        db.close()
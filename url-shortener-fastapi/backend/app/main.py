@@ -1,9 +1,24 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import auth_router
 from app.api import url_router
+from app.db import counter_engine, engine
+from app.visits import visit_recorder
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    visit_recorder.start()
+    yield
+    await visit_recorder.stop()
+    # Pooled aiosqlite connections keep worker threads alive until closed
+    await engine.dispose()
+    await counter_engine.dispose()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(auth_router)
 app.include_router(url_router)
 
@@ -1,4 +1,5 @@
 from .user import User  # noqa: F401
 from .url import Url  # noqa: F401
 from .url_visits import UrlVisit  # noqa: F401
+from .counter import Counter  # noqa: F401
 from .base import Base  # noqa: F401
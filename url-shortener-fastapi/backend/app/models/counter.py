@@ -0,0 +1,12 @@
+from sqlalchemy import BigInteger, Column, String
+from .base import Base
+
+
+class Counter(Base):
+    __tablename__ = "counters"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"Counter(name={self.name}, value={self.value})"
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime
+from typing import NamedTuple
+
+from dotenv import load_dotenv
+from sqlalchemy import bindparam, insert, select, update
+
+from app.db import Session
+from app.models import Url, UrlVisit
+
+load_dotenv()
+VISIT_BATCH_SIZE = int(os.getenv("VISIT_BATCH_SIZE", 500))
+VISIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("VISIT_FLUSH_INTERVAL_SECONDS", 1))
+VISIT_QUEUE_SIZE = int(os.getenv("VISIT_QUEUE_SIZE", 100000))
+
+logger = logging.getLogger(__name__)
+
+HOST_LENGTH = UrlVisit.__table__.c.host.type.length
+USER_AGENT_LENGTH = UrlVisit.__table__.c.user_agent.type.length
+
+
+class Visit(NamedTuple):
+    url_id: int
+    host: str
+    user_agent: str
+    timestamp: datetime
+
+    @classmethod
+    def create(
+        cls, url_id: int, host: str | None, user_agent: str | None, timestamp: datetime
+    ) -> "Visit":
+        """Visit with the client supplied headers cut to fit their columns."""
+        return cls(
+            url_id,
+            (host or "")[:HOST_LENGTH],
+            (user_agent or "")[:USER_AGENT_LENGTH],
+            timestamp,
+        )
+
+
+async def write_visits(visits: list[Visit]):
+    """Insert the visits and add them to their URLs' click counts in one
+    transaction, with a single statement for each."""
+    clicks = Counter(visit.url_id for visit in visits)
+    last_visited: dict[int, datetime] = {}
+    for visit in visits:
+        last_visited[visit.url_id] = max(
+            visit.timestamp, last_visited.get(visit.url_id, visit.timestamp)
+        )
+
+    async with Session() as db, db.begin():
+        # URLs deleted since the redirect would fail the whole batch
+        existing = set(await db.scalars(select(Url.id).where(Url.id.in_(clicks))))
+        rows = [visit._asdict() for visit in visits if visit.url_id in existing]
+        if not rows:
+            return
+        await db.execute(insert(UrlVisit), rows)
+        stmt = (
+            update(Url)
+            .where(Url.id == bindparam("visited_id"))
+            .values(
+                click_count=Url.click_count + bindparam("clicks"),
+                last_visited=bindparam("visited_at"),
+                # A visit is not an edit, keep onupdate from bumping it
+                updated_at=Url.updated_at,
+            )
+        )
+        connection = await db.connection()
+        await connection.execute(
+            stmt,
+            [
+                {
+                    "visited_id": url_id,
+                    "clicks": clicks[url_id],
+                    "visited_at": last_visited[url_id],
+                }
+                for url_id in sorted(existing)
+            ],
+        )
+
+
+class VisitRecorder:
+    """Queues visits from redirects and writes them in batches.
+
+    A batch is written once it holds `batch_size` visits or `flush_interval`
+    seconds after its first visit, whichever comes first. Redirects only
+    wait on the writer when the queue is full.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = VISIT_BATCH_SIZE,
+        flush_interval: float = VISIT_FLUSH_INTERVAL_SECONDS,
+        maxsize: int = VISIT_QUEUE_SIZE,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.maxsize = maxsize
+        self._queue: asyncio.Queue[Visit] = asyncio.Queue(maxsize)
+        self._task: asyncio.Task | None = None
+
+    async def record(self, visit: Visit):
+        await self._queue.put(visit)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                batch = [await self._queue.get()]
+            except asyncio.QueueShutDown:
+                return
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        batch.append(await self._queue.get())
+                except (TimeoutError, asyncio.QueueShutDown):
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[Visit]):
+        try:
+            await write_visits(batch)
+        except Exception:
+            if len(batch) == 1:
+                logger.exception("Failed to record a visit to URL %d", batch[0].url_id)
+                return
+            # Split the batch so a bad row only loses its own visit
+            middle = len(batch) // 2
+            await self._flush(batch[:middle])
+            await self._flush(batch[middle:])
+
+    def start(self):
+        self._queue = asyncio.Queue(self.maxsize)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop accepting visits and write out everything already queued."""
+        self._queue.shutdown()
+        if self._task:
+            await self._task
+            self._task = None
+
+
+visit_recorder = VisitRecorder()
@@ -0,0 +1,4 @@
+import os
+
+# The default counter allocator refuses to start without a key
+os.environ.setdefault("SHORT_CODE_KEY", "test-short-code-key")
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from app.allocator import (
+    BASE62,
+    PERMUTED_BITS,
+    PERMUTED_LENGTH,
+    CounterAllocator,
+    FeistelPermutation,
+    base62,
+    get_allocator,
+)
+
+
+def test_base62():
+    assert base62(0) == "0"
+    assert base62(61) == "Z"
+    assert base62(62) == "10"
+    assert base62(62**3 - 1) == "ZZZ"
+    assert base62(5, 3) == "005"
+
+
+@pytest.mark.parametrize("bits", [2, 8, 12])
+def test_feistel_is_a_bijection(bits):
+    permutation = FeistelPermutation("key", bits)
+    outputs = [permutation(value) for value in range(1 << bits)]
+    assert sorted(outputs) == list(range(1 << bits))
+
+
+def test_feistel_depends_on_key():
+    first, second = FeistelPermutation("a", 12), FeistelPermutation("b", 12)
+    assert [first(v) for v in range(64)] != [second(v) for v in range(64)]
+
+
+def test_permuted_codes_are_unique_and_fixed_length():
+    allocator = CounterAllocator(key="key")
+    values = [*range(10000), (1 << PERMUTED_BITS) - 1]
+    codes = [allocator.encode(value) for value in values]
+    assert len(set(codes)) == len(codes)
+    assert all(len(code) == PERMUTED_LENGTH for code in codes)
+    assert all(set(code) <= set(BASE62) for code in codes)
+
+
+def test_permuted_counter_exhausted():
+    with pytest.raises(RuntimeError):
+        CounterAllocator(key="key").encode(1 << PERMUTED_BITS)
+
+
+def test_sequential_codes():
+    allocator = CounterAllocator()
+    assert [allocator.encode(value) for value in (0, 61, 62)] == ["0", "Z", "10"]
+
+
+def test_allocate_reserves_blocks(monkeypatch):
+    allocator = CounterAllocator(block_size=4)
+    reserved = []
+    counter = 0
+
+    async def reserve(count):
+        nonlocal counter
+        size = max(count, allocator.block_size)
+        reserved.append(size)
+        counter += size
+        return counter - size, counter
+
+    monkeypatch.setattr(allocator, "_reserve", reserve)
+
+    async def allocate():
+        return [await allocator.allocate(None, count) for count in (1, 2, 3, 10)]
+
+    batches = asyncio.run(allocate())
+    codes = [code for batch in batches for code in batch]
+    assert [len(batch) for batch in batches] == [1, 2, 3, 10]
+    assert codes == [base62(value) for value in range(16)]
+    assert reserved == [4, 4, 8]
+
+
+def test_counter_allocator_requires_key(monkeypatch):
+    monkeypatch.setattr("app.allocator.SHORT_CODE_KEY", "")
+    with pytest.raises(ValueError):
+        get_allocator("counter")